@@ -0,0 +1,66 @@
+"""Micro-benchmark for rendering the thread directories.
+
+Run from the repository root with ``python benchmarks/directory_render.py``."""
+import asyncio
+import datetime
+import os
+import sys
+import timeit
+import types
+
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core  # noqa: E402
+
+
+class Guild:
+    """Minimal stand-in for a guild whose threads are all in the gateway cache."""
+
+    id = 0
+    me = types.SimpleNamespace(color=discord.Color.default())
+
+    def get_channel_or_thread(self, thread_id: int) -> types.SimpleNamespace:
+        return types.SimpleNamespace(parent_id=thread_id % 10)
+
+
+def concat_pack_lines(lines: list[str]) -> list[str]:
+    """The previous field packing that builds every field by repeated string concatenation."""
+    field_values: list[str] = []
+    field_value: str = ""
+    for line in lines:
+        if len(field_value + line) > 1024:
+            field_values.append(f"{field_value}\n")
+            field_value = f"{line}\n"
+        else:
+            field_value += f"{line}\n"
+    if field_value != "":
+        field_values.append(field_value)
+    return field_values
+
+
+def main() -> None:
+    guild = Guild()
+    now = discord.utils.utcnow()
+    print(f"{'threads':>8} {'pack_lines':>12} {'concat':>12} {'feedback':>12} {'threads':>12}")
+    for number_of_threads in (100, 1_000, 10_000):
+        thread_ids = list(range(1_000_000, 1_000_000 + number_of_threads))
+        feedback_directory = core.FeedbackThreadDirectory(guild.id, {
+            thread_id: now - datetime.timedelta(minutes=i) for i, thread_id in enumerate(thread_ids)
+        })
+        thread_directory = core.ThreadDirectory(guild.id, thread_ids)
+        lines = feedback_directory.get_lines()
+        runs = max(1, 10_000 // number_of_threads)
+
+        timings = [
+            timeit.timeit(lambda: core.pack_lines(lines), number=runs),
+            timeit.timeit(lambda: concat_pack_lines(lines), number=runs),
+            timeit.timeit(lambda: asyncio.run(feedback_directory.get_embeds(guild)), number=runs),
+            timeit.timeit(lambda: asyncio.run(thread_directory.get_embeds(guild)), number=runs),
+        ]
+        print(f"{number_of_threads:>8} " + " ".join(f"{timing / runs * 1000:>9.3f} ms" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
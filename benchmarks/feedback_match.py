@@ -0,0 +1,55 @@
+"""Micro-benchmark for detecting feedback messages.
+
+Run from the repository root with ``python benchmarks/feedback_match.py``."""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core  # noqa: E402
+
+words = ("blind", "trade", "bastion", "route", "pearl", "portal", "hay", "gold", "pie", "stronghold", "eye", "dragon",
+         "bed", "crystal", "barter", "ender", "nether", "split", "reset", "seed", "timer", "lava", "boat", "obsidian",
+         "<@672768917885681678>", "<:Backseatega:933142144699494410>", "#1", "<#1152697393825976440>")
+
+
+def any_is_feedback(message_content: str) -> bool:
+    """The previous feedback detection that scans the message once per feedback string."""
+    return any(feedback_string in message_content for feedback_string in core.config.feedback_strings)
+
+
+def make_message(length: int, rng: random.Random) -> str:
+    """Builds a message of roughly the given length out of speedrunning words."""
+    message_words: list[str] = []
+    while sum(len(word) + 1 for word in message_words) < length:
+        message_words.append(rng.choice(words))
+    return " ".join(message_words)
+
+
+def make_feedback(rng: random.Random) -> str:
+    """Builds a full feedback message with a heading per split, close to the 2000 character limit."""
+    return "\n".join(f"{heading}\n{make_message(140, rng)}" for heading in core.config.feedback_strings)[:2000]
+
+
+def main() -> None:
+    core.compile_feedback_patterns()
+    rng = random.Random(0)
+    corpora: dict[str, list[str]] = {
+        "short chat": [make_message(rng.randint(10, 200), rng) for _ in range(1_000)],
+        "long chat": [make_message(rng.randint(1_000, 2_000), rng) for _ in range(1_000)],
+        "feedback": [make_feedback(rng) for _ in range(1_000)],
+    }
+    print(f"{'corpus':>12} {'compiled':>12} {'any':>12}")
+    for name, messages in corpora.items():
+        assert [core.is_feedback(message) for message in messages] == [any_is_feedback(m) for m in messages]
+        timings = [
+            timeit.timeit(lambda: [core.is_feedback(message) for message in messages], number=20),
+            timeit.timeit(lambda: [any_is_feedback(message) for message in messages], number=20),
+        ]
+        print(f"{name:>12} " + " ".join(f"{timing / 20 / len(messages) * 1e6:>9.3f} us" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark for the resident memory of the message cache under a replayed message load.
+
+Every profile runs in a fresh interpreter, which builds the bot, replays the same gateway MESSAGE_CREATE payloads in
+the feedback threads of RIP through py-cord's connection state and reports how much the resident memory grew.
+
+Run from the repository root with ``python benchmarks/message_cache_memory.py``."""
+import asyncio
+import gc
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core  # noqa: E402
+
+number_of_messages = 20_000
+number_of_threads = 50
+words = ("blind", "trade", "bastion", "route", "pearl", "portal", "hay", "gold", "pie", "stronghold", "eye", "dragon",
+         "bed", "crystal", "barter", "ender", "nether", "split", "reset", "seed", "timer", "lava", "boat", "obsidian")
+
+
+def get_guild_payload(thread_ids: list[int]) -> dict:
+    """Builds a minimal guild payload with the feedback channel of RIP and its threads."""
+    guild_id = str(core.config.rip_guild_id)
+    return {
+        "id": guild_id, "name": "RIP", "roles": [], "emojis": [], "stickers": [], "features": [], "member_count": 0,
+        "members": [], "voice_states": [], "presences": [],
+        "channels": [{"id": str(core.config.feedback_channel_id), "type": 15, "name": "feedback", "position": 0,
+                      "guild_id": guild_id, "permission_overwrites": []}],
+        "threads": [{"id": str(thread_id), "type": 11, "name": f"thread {thread_id}", "guild_id": guild_id,
+                     "parent_id": str(core.config.feedback_channel_id), "owner_id": "1",
+                     "thread_metadata": {"archived": False, "auto_archive_duration": 10080,
+                                         "archive_timestamp": "2024-01-01T00:00:00+00:00", "locked": False}}
+                    for thread_id in thread_ids],
+    }
+
+
+def get_message_payload(message_id: int, thread_id: int, rng: random.Random) -> dict:
+    """Builds a MESSAGE_CREATE payload of a member chatting in a feedback thread."""
+    author_id = str(rng.randint(1, 5_000))
+    return {
+        "id": str(message_id), "channel_id": str(thread_id), "guild_id": str(core.config.rip_guild_id),
+        "type": 0, "tts": False, "pinned": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+        "attachments": [], "embeds": [], "timestamp": "2024-01-01T00:00:00+00:00", "edited_timestamp": None,
+        "author": {"id": author_id, "username": f"user{author_id}", "discriminator": "0", "avatar": None},
+        "member": {"roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False},
+        "content": " ".join(rng.choice(words) for _ in range(rng.randint(5, 250))),
+    }
+
+
+async def replay(profile: str) -> None:
+    """Replays the message load with a message cache profile and prints the growth of the resident memory."""
+    core.config.message_cache_profile = profile
+    bot = core.AimBot()
+    state = bot._connection  # noqa
+    thread_ids = list(range(2_000_000, 2_000_000 + number_of_threads))
+    state._add_guild_from_data(get_guild_payload(thread_ids))  # noqa
+    rng = random.Random(0)
+    payloads = [get_message_payload(3_000_000 + i, rng.choice(thread_ids), rng) for i in range(number_of_messages)]
+    gc.collect()
+    memory_before = core.get_memory_usage()
+    started_at = time.perf_counter()
+    for i, payload in enumerate(payloads):
+        state.parse_message_create(payload)
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+    await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - started_at
+    del payloads
+    gc.collect()
+    memory_after = core.get_memory_usage()
+    print(f"{profile:>8} {(memory_after - memory_before) / 2 ** 20:>10.1f} MiB {memory_after / 2 ** 20:>10.1f} MiB "
+          f"{len(bot.cached_messages):>8} {bot.message_route_stats['routed']:>8} "
+          f"{elapsed / number_of_messages * 1e6:>8.1f} us")
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        asyncio.run(replay(sys.argv[1]))
+        return
+    if core.get_memory_usage() is None:
+        print("Resident memory can't be read on this platform.")
+        return
+    print(f"Replaying {number_of_messages} messages, message cache size {core.config.message_cache_size}")
+    print(f"{'profile':>8} {'growth':>14} {'resident':>14} {'cached':>8} {'routed':>8} {'per msg':>11}")
+    for profile in ("default", "lean"):
+        subprocess.run([sys.executable, os.path.abspath(__file__), profile], check=True)
+
+
+if __name__ == "__main__":
+    main()
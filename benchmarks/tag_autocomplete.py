@@ -0,0 +1,53 @@
+"""Micro-benchmark for autocompleting tag names.
+
+Run from the repository root with ``python benchmarks/tag_autocomplete.py``."""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core  # noqa: E402
+
+words = ("Bastion", "Blaze", "Bridge", "Cobble", "Dynamic", "Housing", "Kuee", "Language", "Lauf", "Lava", "Manhunt",
+         "Mapless", "Ninjabrain", "Pig", "Preemptive", "Navigation", "Rawalle", "Reset", "Tracker", "Shoulder",
+         "Stables", "Sub", "Pixel", "Treasure", "Wall", "Wood", "Light", "Zero", "Cycle", "Portal", "Pearl", "Gold")
+syllables = ("ba", "sti", "on", "la", "va", "ho", "us", "ing", "nin", "ja", "brain", "pe", "arl", "por", "tal", "re",
+             "set", "wa", "ll", "zer", "o", "cy", "cle", "sta", "ble", "gol", "d", "tre", "a", "sure", "ma", "hunt")
+
+
+def substring_autocomplete(names: list[str], query: str) -> list[str]:
+    """The previous autocomplete of basic_autocomplete, a case-insensitive substring scan over every tag name."""
+    query = query.lower()
+    return [name for name in names if query in name.lower()][:25]
+
+
+def make_word(rng: random.Random) -> str:
+    """Builds a made-up, capitalised word so the generated tag names don't all share the same trigrams."""
+    return "".join(rng.choice(syllables) for _ in range(rng.randint(1, 4))).capitalize()
+
+
+def main() -> None:
+    rng = random.Random(0)
+    queries = ("", "ho", "hous", "ninja", "ninjabrian", "lava plac", "stabels", "zzz")
+    print(f"{'tags':>8} {'store':>12} {'substring':>12}")
+    for number_of_tags in (25, 1_000, 10_000):
+        names: list[str] = list(words[:number_of_tags])
+        while len(names) < number_of_tags:
+            names.append(" ".join(make_word(rng) for _ in range(rng.randint(1, 3))))
+        tag_store = core.TagStore(core.config.tag_path)
+        for name in names:
+            tag_store.tags[name] = ""
+            tag_store.index(name)
+        runs = 1_000
+        timings = [
+            timeit.timeit(lambda: [tag_store.autocomplete(query) for query in queries], number=runs),
+            timeit.timeit(lambda: [substring_autocomplete(names, query) for query in queries], number=runs),
+        ]
+        print(f"{number_of_tags:>8} " + " ".join(f"{timing / runs / len(queries) * 1e6:>9.1f} us"
+                                                 for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -50,7 +50,7 @@ class BugReportModal(discord.ui.Modal):
                 label="Bug Name:",
                 placeholder="Please enter a name for the bug...",
                 style=discord.InputTextStyle.short,
-                max_length=2000,
+                max_length=200,
             ),
             discord.ui.InputText(
                 label="Bug Description:",
@@ -83,10 +83,7 @@ class BugReportModal(discord.ui.Modal):
         bug_report_embed = core.BugReportEmbed(bug_name=bug_name, bug_description=bug_description,
                                                steps_to_reproduce=steps_to_reproduce, author=author)
 
-        await interaction.client.errors_webhook.send(
-            embed=bug_report_embed,
-            avatar_url=interaction.client.user.display_avatar.url
-        )
+        interaction.client.outbox.put(bug_report_embed)
 
         await interaction.response.send_message(embed=core.GreenEmbed(
             title="Bug Reported",
@@ -103,7 +100,7 @@ class FeatureRequestModal(discord.ui.Modal):
                 label="Feature Name:",
                 placeholder="Please enter a name for the feature...",
                 style=discord.InputTextStyle.short,
-                max_length=2000,
+                max_length=200,
             ),
             discord.ui.InputText(
                 label="Bug Description:",
@@ -128,10 +125,7 @@ class FeatureRequestModal(discord.ui.Modal):
         feature_request_embed = core.FeatureRequestEmbed(feature_name=name, feature_description=description,
                                                          author=author)
 
-        await interaction.client.errors_webhook.send(
-            embed=feature_request_embed,
-            avatar_url=interaction.client.user.display_avatar.url
-        )
+        interaction.client.outbox.put(feature_request_embed)
 
         await interaction.response.send_message(embed=core.GreenEmbed(
             title="Feature Requested",
@@ -1,5 +1,5 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 import core
 
@@ -7,6 +7,22 @@ import core
 class General(core.Cog):
     """Utility commands for general information and interactions!"""
 
+    def __init__(self, bot: core.AimBot) -> None:
+        super().__init__(bot)
+        self.reload_tags.start()
+
+    def cog_unload(self) -> None:
+        self.reload_tags.cancel()
+
+    @tasks.loop(seconds=core.config.tag_reload_interval)
+    async def reload_tags(self):
+        """Task for reloading the tags whenever the tag file is changed outside the bot."""
+        try:
+            if core.tag_store.reload():
+                print(f"Reloaded the tags from {core.tag_store.path}")
+        except (OSError, ValueError) as e:
+            print(f"Failed to reload the tags, keeping the previous ones: {e}")
+
     @commands.slash_command(description="Shows the bot's latency!")
     async def ping(self, ctx: discord.ApplicationContext):
         """Command for showing the bot's latency.
@@ -122,8 +138,7 @@ class General(core.Cog):
 
     @commands.slash_command(description="Sends a tag!")
     async def tag(self, ctx: discord.ApplicationContext,
-                  tag: discord.Option(str, "Please enter the tag name!",
-                                      autocomplete=discord.utils.basic_autocomplete(core.get_tag()),
+                  tag: discord.Option(str, "Please enter the tag name!", autocomplete=core.autocomplete_tags,
                                       required=True)):
         """Command for sending a tag.
 
@@ -132,29 +147,104 @@ class General(core.Cog):
         ctx: discord.ApplicationContext
             The context used for command invocation.
         tag: str
-            The name of the tag to send. Autocompletes from the tags in config.tags."""
-        tags = core.get_tag()
-        if tag not in tags:
+            The name of the tag to send. Autocompletes from the tags in the tag store."""
+        tag_embed: discord.Embed | None = core.tag_store.get_embed(tag)
+        if tag_embed is None:
             await ctx.respond(embed=core.RedEmbed(
                 title="Tag not found",
                 description=f"Tag `{tag}` not found!"
             ), ephemeral=True)
             return
-        image_url: str | None = None
-        lines = tags[tag].split("\r\n")
-        for line in lines:
-            if line.endswith(".png"):
-                image_url = line
-                tags[tag] = tags[tag].replace(line, "")
-                break
-        tag_embed = core.GreenEmbed(
-            title=tag,
-            description=tags[tag]
-        )
-        if image_url:
-            tag_embed.set_image(url=image_url)
         await ctx.respond(embed=tag_embed)
 
+    tags_group = discord.SlashCommandGroup(
+        name="tags",
+        description="Group of tag management commands!",
+        default_member_permissions=discord.Permissions(administrator=True)
+    )
+
+    @tags_group.command(name="add", description="Adds or edits a tag!")
+    async def tags_add(self, ctx: discord.ApplicationContext,
+                       tag: discord.Option(str, "Please enter the tag name!", autocomplete=core.autocomplete_tags,
+                                           max_length=100, required=True)):
+        """Command for adding or editing a tag.
+
+        Parameters
+        ------------
+        ctx: discord.ApplicationContext
+            The context used for command invocation.
+        tag: str
+            The name of the tag to add or edit."""
+        await ctx.send_modal(TagModal(tag, core.tag_store.get(tag), title="Add Tag"))
+
+    @tags_group.command(name="stats", description="Shows how often the tags were used!")
+    async def tags_stats(self, ctx: discord.ApplicationContext):
+        """Command for showing how often the tags were used since the bot started.
+
+        Parameters
+        ------------
+        ctx: discord.ApplicationContext
+            The context used for command invocation."""
+        await ctx.respond(embed=core.GreenEmbed(
+            title="Tag Statistics",
+            description="\n".join(f"- {tag}: {uses}" for tag, uses in core.tag_store.uses.most_common(25))
+                        or "_No tags were used yet_"
+        ), ephemeral=True)
+
+    @tags_group.command(name="remove", description="Removes a tag!")
+    async def tags_remove(self, ctx: discord.ApplicationContext,
+                          tag: discord.Option(str, "Please enter the tag name!", autocomplete=core.autocomplete_tags,
+                                              required=True)):
+        """Command for removing a tag.
+
+        Parameters
+        ------------
+        ctx: discord.ApplicationContext
+            The context used for command invocation.
+        tag: str
+            The name of the tag to remove."""
+        if not core.tag_store.remove(tag):
+            await ctx.respond(embed=core.RedEmbed(
+                title="Tag not found",
+                description=f"Tag `{tag}` not found!"
+            ), ephemeral=True)
+            return
+        await ctx.respond(embed=core.GreenEmbed(
+            title="Tag Removed",
+            description=f"Tag `{tag}` has been removed!"
+        ), ephemeral=True)
+
 
 def setup(bot):
     bot.add_cog(General(bot))
+
+
+class TagModal(discord.ui.Modal):
+    """Modal for adding or editing a tag."""
+
+    def __init__(self, tag: str, content: str | None, *args, **kwargs):
+        self.tag: str = tag
+        super().__init__(
+            discord.ui.InputText(
+                label="Tag Content:",
+                placeholder="Please enter the content of the tag...",
+                style=discord.InputTextStyle.long,
+                value=content,
+                max_length=4000,
+            ),
+            *args,
+            **kwargs
+        )
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        """Callback for when the modal is submitted.
+
+        Parameters
+        ------------
+        interaction: discord.Interaction
+            The interaction that submitted the modal."""
+        is_new: bool = core.tag_store.add(self.tag, self.children[0].value)
+        await interaction.response.send_message(embed=core.GreenEmbed(
+            title="Tag Added" if is_new else "Tag Edited",
+            description=f"Tag `{self.tag}` has been {'added' if is_new else 'edited'}!"
+        ), ephemeral=True)
@@ -1,4 +1,7 @@
+import asyncio
+
 import discord
+from discord.ext import tasks
 
 import core
 
@@ -6,6 +9,62 @@ import core
 class Threads(core.Cog):
     """Manage threads and add members!"""
 
+    def __init__(self, bot: core.AimBot) -> None:
+        super().__init__(bot)
+        self.onboarding_queue: core.OnboardingQueue = core.OnboardingQueue(bot, core.config.onboarding_workers)
+        self.reconcile_directories.start()
+        self.reload_guild_policies.start()
+        self.prune_member_cache.start()
+        bot.add_message_route(core.config.rip_guild_id, core.config.feedback_channel_id, self.on_feedback_message)
+
+    def cog_unload(self) -> None:
+        self.bot.remove_message_route(core.config.rip_guild_id, core.config.feedback_channel_id,
+                                      self.on_feedback_message)
+        self.onboarding_queue.stop()
+        self.reconcile_directories.cancel()
+        self.reload_guild_policies.cancel()
+        self.prune_member_cache.cancel()
+
+    @tasks.loop(minutes=core.config.directory_reconcile_interval)
+    async def reconcile_directories(self):
+        """Task for repairing the thread directories of all guilds on startup and periodically afterwards."""
+        for guild in self.bot.guilds:
+            try:
+                reconciled_ids: tuple[list[int], list[int]] | None = await core.reconcile_directory(guild)
+            except Exception:
+                await self.bot.on_error("reconcile_directories", guild)
+                continue
+            if reconciled_ids is None:
+                continue
+            added_ids, removed_ids = reconciled_ids
+            if added_ids or removed_ids:
+                print(f"Reconciled the thread directory of {guild.name} ({guild.id}): "
+                      f"added {len(added_ids)} threads, removed {len(removed_ids)} threads")
+
+    @reconcile_directories.before_loop
+    async def before_reconcile_directories(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(seconds=core.config.guild_policy_reload_interval)
+    async def reload_guild_policies(self):
+        """Task for reloading the guild policies whenever the guild policy file changes."""
+        try:
+            if core.guild_policies.reload():
+                print(f"Reloaded the guild policies from {core.guild_policies.path}")
+        except (OSError, ValueError) as e:
+            print(f"Failed to reload the guild policies, keeping the previous ones: {e}")
+
+    @tasks.loop(minutes=core.config.member_cache_prune_interval)
+    async def prune_member_cache(self):
+        """Task for evicting the members py-cord cached outside the member cache policy."""
+        for guild in self.bot.guilds:
+            core.member_cache.prune(guild)
+        core.member_cache.save_snapshot(self.bot.guilds)
+
+    @prune_member_cache.before_loop
+    async def before_prune_member_cache(self):
+        await self.bot.wait_until_ready()
+
     @core.Cog.listener()
     async def on_thread_create(self, thread: discord.Thread):
         """Event for when a thread is created.
@@ -14,8 +73,18 @@ class Threads(core.Cog):
         ------------
         thread: discord.Thread
             The thread that was created."""
+        core.thread_owner_index.add_thread(thread)
         if not core.is_valid_thread(thread):
             return
+        self.onboarding_queue.submit(thread, self.onboard_thread)
+
+    async def onboard_thread(self, thread: discord.Thread):
+        """Onboards a thread that was created.
+
+        Parameters
+        ------------
+        thread: discord.Thread
+            The thread to onboard."""
         if thread.guild.id != core.config.rip_guild_id:
             await thread.edit(auto_archive_duration=10080)
             await core.add_members(thread)
@@ -42,6 +111,7 @@ class Threads(core.Cog):
             The thread before the update.
         after: discord.Thread
             The thread after the update."""
+        core.thread_owner_index.update_thread(after)
         if not core.is_valid_thread(after):
             return
         if after.guild.id != core.config.rip_guild_id:
@@ -54,33 +124,48 @@ class Threads(core.Cog):
         if before_tag_ids == after_tag_ids:
             return
         if core.config.bell_tag_id in after_tag_ids and core.config.bell_tag_id not in before_tag_ids:
-            await after.unarchive()
-            await after.edit(auto_archive_duration=10080)
-            await core.add_members(after)
-            await core.add_to_feedback_thread_directory(after)
+            self.onboarding_queue.submit(after, self.onboard_feedback_thread)
             return
         if core.config.bell_tag_id not in after_tag_ids and core.config.bell_tag_id in before_tag_ids:
             await after.edit(auto_archive_duration=1440)
             await core.remove_from_feedback_thread_directory(after)
             return
 
-    @core.Cog.listener()
-    async def on_thread_delete(self, thread: discord.Thread):
-        """Event for when a thread is deleted.
+    async def onboard_feedback_thread(self, thread: discord.Thread):
+        """Onboards a thread that started waiting for feedback.
 
         Parameters
         ------------
         thread: discord.Thread
-            The thread that was deleted."""
-        if not thread.guild.id == core.config.rip_guild_id:
+            The thread to onboard."""
+        await thread.unarchive()
+        await thread.edit(auto_archive_duration=10080)
+        await core.add_members(thread)
+        await core.add_to_feedback_thread_directory(thread)
+
+    @core.Cog.listener()
+    async def on_raw_thread_delete(self, payload: discord.RawThreadDeleteEvent):
+        """Event for when a thread is deleted, including archived threads that aren't cached.
+
+        Parameters
+        ------------
+        payload: discord.RawThreadDeleteEvent
+            The payload for the deleted thread."""
+        core.parent_id_cache.invalidate(payload.thread_id)
+        if payload.thread is not None:
+            core.thread_owner_index.remove_thread(payload.thread)
+        guild = self.bot.get_guild(payload.guild_id)
+        if guild is None or guild.id not in core.guild_policies.thread_dirs:
             return
-        if thread.parent_id == core.config.rip_ticket_channel_id:
+        if guild.id != core.config.rip_guild_id:
+            core.submit_directory_operation(guild, "remove", payload.thread_id)
+            return
+        if payload.parent_id == core.config.rip_ticket_channel_id:
             return
-        await core.remove_from_feedback_thread_directory(thread)
+        core.submit_directory_operation(guild, "remove", payload.thread_id, feedback=True)
 
-    @core.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        """Event for when a feedback message is sent.
+    async def on_feedback_message(self, message: discord.Message):
+        """Handler for when a message is sent in a feedback thread, routed by the bot.
 
         Parameters
         ------------
@@ -88,17 +173,118 @@ class Threads(core.Cog):
             The message that was sent."""
         if message.author.bot:
             return
-        if message.guild.id != core.config.rip_guild_id:
-            return
-        if not core.is_valid_thread(message.channel):
-            return
-        if message.channel.parent_id != core.config.feedback_channel_id:
-            return
         if not core.is_feedback(message.content):
             return
 
         await core.feedback_received(message)
 
+    @core.Cog.listener()
+    async def on_ready(self):
+        """Event for when the bot is ready, which is before the guilds were chunked with targeted startup chunking."""
+        for guild in self.bot.guilds:
+            core.thread_owner_index.build(guild)
+        asyncio.create_task(self.index_members())
+
+    async def index_members(self):
+        """Builds the role index of every guild, requesting only the members it needs unless the guilds were chunked.
+
+        With targeted startup chunking only the ping and mod role holders saved by the last run are requested. A guild
+        without a saved snapshot, e.g. on the first start, is chunked once in full."""
+        snapshot: dict[int, list[int]] = core.member_cache.load_snapshot()
+        evicted: int = 0
+        for guild in self.bot.guilds:
+            evicted += await self.index_guild_members(guild, snapshot)
+        core.member_cache.save_snapshot(self.bot.guilds)
+        memory_usage: int | None = core.get_memory_usage()
+        if memory_usage is not None:
+            print(f"Memory usage after startup: {memory_usage / 2 ** 20:.1f} MiB "
+                  f"({sum(len(guild.members) for guild in self.bot.guilds)} members cached, {evicted} evicted)")
+
+    async def index_guild_members(self, guild: discord.Guild, snapshot: dict[int, list[int]]) -> int:
+        """Builds the role index of a guild and prunes its member cache.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild to index the members of.
+        snapshot: dict[int, list[int]]
+            The ids of the resident members of each guild saved by the last run.
+
+        Returns
+        -----------
+        int
+            The number of evicted members."""
+        try:
+            if guild.chunked:
+                core.role_index.build(guild)
+            elif guild.id in snapshot:
+                await core.role_index.build_targeted(guild, snapshot[guild.id])
+            else:
+                await guild.chunk()
+                core.role_index.build(guild)
+        except Exception:
+            core.role_index.build(guild)
+            await self.bot.on_error("index_guild_members", guild)
+        return core.member_cache.prune(guild)
+
+    @core.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        """Event for when the bot joins a guild.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild that was joined."""
+        await self.index_guild(guild)
+
+    @core.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        """Event for when a guild becomes available, e.g. after an outage.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild that became available."""
+        await self.index_guild(guild)
+
+    async def index_guild(self, guild: discord.Guild):
+        """Indexes the threads and members of a guild that was joined or became available after startup.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild to index."""
+        if not self.bot.is_ready():
+            # the guilds available at startup are indexed once the bot is ready
+            return
+        core.thread_owner_index.build(guild)
+        await self.index_guild_members(guild, core.member_cache.load_snapshot())
+        core.member_cache.save_snapshot([guild])
+
+    @core.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        """Event for when a member joins a guild.
+
+        Parameters
+        ------------
+        member: discord.Member
+            The member that joined."""
+        core.role_index.add_member(member)
+        core.member_cache.touch(member)
+
+    @core.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Event for when a member is updated.
+
+        Parameters
+        ------------
+        before: discord.Member
+            The member before the update.
+        after: discord.Member
+            The member after the update."""
+        core.role_index.update_member(before, after)
+        core.member_cache.touch(after)
+
     @core.Cog.listener()
     async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
         """Event for when a member leaves the guild.
@@ -107,10 +293,45 @@ class Threads(core.Cog):
         ------------
         payload: discord.RawMemberRemoveEvent
             The payload for the member that left."""
+        guild = self.bot.get_guild(payload.guild_id)
+        core.role_index.remove_member(guild, payload.user.id)
         if payload.guild_id != core.config.rip_guild_id:
             return
-        guild = self.bot.get_guild(payload.guild_id)
-        [await thread.delete() for thread in guild.threads if payload.user.id == thread.owner_id]
+        threads: list[discord.Thread] = core.thread_owner_index.get_threads(guild, payload.user.id)
+        for thread in threads:
+            await core.remove_from_feedback_thread_directory(thread)
+        await core.delete_threads(threads)
+
+    @core.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        """Event for when a message is edited.
+
+        Parameters
+        ------------
+        payload: discord.RawMessageUpdateEvent
+            The payload for the edited message."""
+        core.refresh_thread_dir_msg(payload)
+
+    @core.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        """Event for when a message is deleted.
+
+        Parameters
+        ------------
+        payload: discord.RawMessageDeleteEvent
+            The payload for the deleted message."""
+        core.invalidate_thread_dir_msg(payload.message_id)
+
+    @core.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        """Event for when messages are bulk deleted.
+
+        Parameters
+        ------------
+        payload: discord.RawBulkMessageDeleteEvent
+            The payload for the deleted messages."""
+        for message_id in payload.message_ids:
+            core.invalidate_thread_dir_msg(message_id)
 
     add_group = discord.SlashCommandGroup(
         name="add",
@@ -181,9 +402,12 @@ class Threads(core.Cog):
                 description=f"Added thread <#{thread.id}> to the thread directory successfully!"
             ), ephemeral=True)
             return
+        description = f"Failed to add thread <#{thread.id}> to the thread directory!"
+        if thread.guild.id == core.config.rip_guild_id:
+            description += " Only threads waiting for feedback can be added to the feedback thread directory."
         await ctx.followup.send(embed=core.RedEmbed(
             title="Error",
-            description=f"Failed to add thread <#{thread.id}> to the thread directory!"
+            description=description
         ), ephemeral=True)
 
     @thread_directory_group.command(name="remove", description="Removes the thread from the thread directory!")
@@ -217,6 +441,83 @@ class Threads(core.Cog):
             description=f"Failed to remove thread <#{thread.id}> from the thread directory!"
         ), ephemeral=True)
 
+    @thread_directory_group.command(name="stats", description="Shows the thread directory statistics!")
+    async def thread_directory_stats(self, ctx: discord.ApplicationContext):
+        """Command for showing the thread directory statistics.
+
+        Parameters
+        ------------
+        ctx: discord.ApplicationContext
+            The context used for command invocation."""
+        stats: dict[str, int] = core.parent_id_cache.stats
+        thread_directory_stats_embed = core.GreenEmbed(
+            title="Thread Directory Statistics",
+            description=f"Cached parent ids: {len(core.parent_id_cache.entries)}"
+        )
+        thread_directory_stats_embed.add_field(
+            name="Parent Id Lookups",
+            value=f"- Cache hits: {stats['cache']}\n"
+                  f"- Gateway cache hits: {stats['gateway']}\n"
+                  f"- Active threads hits: {stats['active_threads']}\n"
+                  f"- REST fetches: {stats['rest']}",
+            inline=False
+        )
+        actor: core.DirectoryActor | None = core.get_directory_actor(ctx.guild_id)
+        if actor is not None:
+            thread_directory_stats_embed.add_field(
+                name="Directory Updates",
+                value=f"- Queue depth: {actor.queue.qsize()}\n"
+                      f"- Applied operations: {actor.operations}\n"
+                      f"- Average latency: {actor.average_latency * 1000:.2f} ms\n"
+                      f"- Max latency: {actor.max_latency * 1000:.2f} ms",
+                inline=False
+            )
+        thread_directory_stats_embed.add_field(
+            name="Message Routing",
+            value=f"- Routed messages: {self.bot.message_route_stats['routed']}\n"
+                  f"- Dropped messages: {self.bot.message_route_stats['dropped']}",
+            inline=False
+        )
+        await ctx.respond(embed=thread_directory_stats_embed, ephemeral=True)
+
+    thread_onboarding_group = thread_group.create_subgroup(
+        name="onboarding",
+        description="Group of thread onboarding commands!",
+    )
+
+    @thread_onboarding_group.command(name="status", description="Shows the onboarding status of the thread!")
+    async def thread_onboarding_status(self, ctx: discord.ApplicationContext,
+                                       thread: discord.Option(discord.Thread, "Please enter the thread!",
+                                                              required=False)):
+        """Command for showing the onboarding status of the thread.
+
+        Parameters
+        ------------
+        ctx: discord.ApplicationContext
+            The context used for command invocation.
+        thread: discord.Thread
+            The thread to show the onboarding status of."""
+        thread: discord.Thread | None = await core.get_valid_thread(ctx=ctx, thread=thread)
+        if thread is None:
+            return
+        onboarding_status_embed = core.GreenEmbed(
+            title="Onboarding Status",
+            description=f"- Queued jobs: {self.onboarding_queue.queued}\n"
+                        f"- Running jobs: {self.onboarding_queue.running}"
+        )
+        job: core.OnboardingJob | None = self.onboarding_queue.get_job(thread.id)
+        if job is None:
+            onboarding_status_embed.add_field(name=f"<#{thread.id}>", value="_Not onboarded recently_")
+        else:
+            job_status = f"- Status: {job.status}\n" \
+                         f"- Queued: {discord.utils.format_dt(job.enqueued_at, style='R')}"
+            if job.started_at is not None:
+                job_status += f"\n- Started: {discord.utils.format_dt(job.started_at, style='R')}"
+            if job.finished_at is not None:
+                job_status += f"\n- Finished: {discord.utils.format_dt(job.finished_at, style='R')}"
+            onboarding_status_embed.add_field(name=f"<#{thread.id}>", value=job_status)
+        await ctx.respond(embed=onboarding_status_embed, ephemeral=True)
+
 
 def setup(bot):
     bot.add_cog(Threads(bot))
@@ -2,7 +2,14 @@ from discord.ext import commands
 
 from .bot import AimBot
 from .config import *
+from .directory import *
 from .embeds import *
+from .errors import *
+from .members import *
+from .onboarding import *
+from .outbox import *
+from .policies import *
+from .tags import *
 from .utils import *
 
 __all__ = (
@@ -11,24 +18,67 @@ __all__ = (
     "add_to_feedback_thread_directory",
     "add_to_thread_directory",
     "AimBot",
+    "autocomplete_tags",
     "BlurpleEmbed",
     "BugReportEmbed",
     "Cog",
+    "compile_feedback_patterns",
+    "delete_threads",
+    "DirectoryActor",
+    "DirectoryOperation",
+    "DirectoryWriter",
     "Embed",
     "EmbedToolEmbed",
+    "ErrorReport",
+    "ErrorReporter",
     "FeatureRequestEmbed",
+    "FeedbackThreadDirectory",
+    "flush_directory_edits",
+    "get_archived_thread_ids",
+    "get_directory_actor",
+    "get_feedback_thread_directory",
+    "get_memory_usage",
     "get_permissions",
-    "get_tag",
+    "get_thread_directory",
     "get_valid_thread",
     "GreenEmbed",
+    "guild_policies",
+    "GuildPolicies",
+    "GuildPolicyRegistry",
+    "HelpCatalog",
     "HelpEmbed",
     "HelpSelect",
     "HelpSelectEmbed",
+    "invalidate_thread_dir_msg",
     "is_feedback",
     "is_valid_thread",
+    "is_waiting_for_feedback",
+    "member_cache",
+    "MemberCachePolicy",
+    "OnboardingJob",
+    "OnboardingQueue",
+    "Outbox",
+    "pack_embeds",
+    "pack_fields",
+    "pack_lines",
+    "plan_mention_edits",
+    "PrefixTrie",
+    "parent_id_cache",
+    "ParentIdCache",
+    "reconcile_directory",
     "RedEmbed",
+    "refresh_thread_dir_msg",
     "remove_from_feedback_thread_directory",
     "remove_from_thread_directory",
+    "resolve_parent_ids",
+    "role_index",
+    "RoleIndex",
+    "submit_directory_operation",
+    "tag_store",
+    "TagStore",
+    "ThreadDirectory",
+    "thread_owner_index",
+    "ThreadOwnerIndex",
     "TutorialEmbed",
     "YellowEmbed"
 )
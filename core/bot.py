@@ -2,6 +2,7 @@ import os
 import platform
 import sys
 import traceback
+from typing import Awaitable, Callable
 
 import discord
 from aiohttp import ClientSession
@@ -11,6 +12,7 @@ import core.config
 
 class AimBot(discord.Bot):
     on_ready_fired: bool = False
+    help_catalog: "core.HelpCatalog | None" = None
 
     def __init__(self):
         super().__init__(
@@ -25,9 +27,24 @@ class AimBot(discord.Bot):
                 message_content=True
             ),
             owner_ids=[672768917885681678],
+            chunk_guilds_at_startup=core.config.startup_chunking == "full",
+            max_messages=None if core.config.message_cache_profile == "lean" else core.config.message_cache_size,
         )
 
         self.errors_webhook = None
+        self.message_routes: dict[tuple[int, int], list[Callable[[discord.Message], Awaitable[None]]]] = {}
+        self.message_route_stats: dict[str, int] = {"routed": 0, "dropped": 0}
+        self.error_reporter: core.ErrorReporter = core.ErrorReporter(
+            self, core.config.error_report_interval, core.config.error_fingerprint_frames,
+            core.config.error_report_max_backoff
+        )
+        self.outbox: core.Outbox = core.Outbox(
+            self, core.config.outbox_path, core.config.outbox_interval, core.config.outbox_max_backoff
+        )
+
+        core.compile_feedback_patterns()
+        core.guild_policies.load()
+        core.tag_store.load()
 
         for filename in os.listdir("cogs"):
             if filename.endswith(".py"):
@@ -38,6 +55,26 @@ class AimBot(discord.Bot):
     def http_session(self) -> ClientSession:
         return self.http._HTTPClient__session
 
+    def add_cog(self, cog: discord.Cog, *, override: bool = False) -> None:
+        super().add_cog(cog, override=override)
+        self.help_catalog = None
+
+    def remove_cog(self, name: str) -> discord.Cog | None:
+        cog: discord.Cog | None = super().remove_cog(name)
+        self.help_catalog = None
+        return cog
+
+    def get_help_catalog(self) -> "core.HelpCatalog":
+        """Gets the help catalog, building it if the cogs changed since it was last built.
+
+        Returns
+        -------
+        core.HelpCatalog
+            The help catalog."""
+        if self.help_catalog is None:
+            self.help_catalog = core.HelpCatalog.build(self)
+        return self.help_catalog
+
     def load_cog(self, cog: str) -> None:
         try:
             self.load_extension(cog)
@@ -45,6 +82,10 @@ class AimBot(discord.Bot):
             e = getattr(e, "original", e)
             print("".join(traceback.format_exception(type(e), e, e.__traceback__)))
 
+    async def on_connect(self):
+        await super().on_connect()
+        self.help_catalog = core.HelpCatalog.build(self)
+
     async def on_ready(self):
         if self.on_ready_fired:
             return
@@ -55,6 +96,8 @@ class AimBot(discord.Bot):
             session=self.http_session,
             bot_token=self.http.token,
         )
+        self.error_reporter.start()
+        self.outbox.start()
 
         msg = f"""{self.user.name} is online now!
             BotID: {self.user.id}
@@ -64,6 +107,51 @@ class AimBot(discord.Bot):
             PyCord API version: {discord.__version__}"""
         print(f"\n\n{msg}\n\n")
 
+    def add_message_route(self, guild_id: int, parent_id: int,
+                          handler: Callable[[discord.Message], Awaitable[None]]) -> None:
+        """Routes the messages sent in the threads of a channel to a handler.
+
+        Parameters
+        ----------
+        guild_id: int
+            The id of the guild of the channel.
+        parent_id: int
+            The id of the channel whose threads the messages are sent in.
+        handler: Callable[[discord.Message], Awaitable[None]]
+            The coroutine function that handles the messages."""
+        self.message_routes.setdefault((guild_id, parent_id), []).append(handler)
+
+    def remove_message_route(self, guild_id: int, parent_id: int,
+                             handler: Callable[[discord.Message], Awaitable[None]]) -> None:
+        """Stops routing the messages sent in the threads of a channel to a handler.
+
+        Parameters
+        ----------
+        guild_id: int
+            The id of the guild of the channel.
+        parent_id: int
+            The id of the channel whose threads the messages are sent in.
+        handler: Callable[[discord.Message], Awaitable[None]]
+            The coroutine function that handled the messages."""
+        handlers: list[Callable[[discord.Message], Awaitable[None]]] = self.message_routes.get(
+            (guild_id, parent_id), []
+        )
+        if handler in handlers:
+            handlers.remove(handler)
+        if not handlers:
+            self.message_routes.pop((guild_id, parent_id), None)
+
+    async def on_message(self, message: discord.Message):
+        handlers: list[Callable[[discord.Message], Awaitable[None]]] | None = self.message_routes.get(
+            (getattr(message.guild, "id", None), getattr(message.channel, "parent_id", None))
+        )
+        if handlers is None:
+            self.message_route_stats["dropped"] += 1
+            return
+        self.message_route_stats["routed"] += 1
+        for handler in handlers:
+            self._schedule_event(handler, "on_message", message)
+
     async def on_application_command_error(self, ctx: discord.ApplicationContext, error: Exception):
         if isinstance((error := error.original), discord.HTTPException):
             description = f"""An HTTP exception has occurred:
@@ -90,63 +178,71 @@ class AimBot(discord.Bot):
         else:
             guild = "None (DMs)"
         formatted_error = ''.join(traceback.format_exception(type(error), error, error.__traceback__))
-        error_embed = discord.Embed(
-            title=error.__class__.__name__,
-            description=str(error),
-            color=discord.Color.red(),
-            timestamp=discord.utils.utcnow()
-        )
-        error_embed.add_field(name="Command:", value=f"`/{ctx.command.qualified_name}`", inline=True)
-        error_embed.add_field(name="Guild:", value=f"`{guild}`", inline=True)
-        error_embed.add_field(name="Error:", value=f"```py\n{formatted_error}```", inline=False)
-        if len(error_embed.fields[2].value) > 1024:
-            error_embed.remove_field(2)
-            error_embed.add_field(
-                name="Error:",
-                value=f"```py\n{formatted_error[:1011]}```",
-                inline=False
-            )
-            for i in range(1011, len(formatted_error), 1011):
-                error_embed.add_field(
-                    name="",
-                    value=f"```py\n{formatted_error[i:i + 1011]}```",
-                    inline=False
-                )
-        return await self.errors_webhook.send(
-            embed=error_embed,
-            avatar_url=self.user.display_avatar.url
-        )
+        self.error_reporter.report(error, formatted_error, [
+            ("Command:", f"`/{ctx.command.qualified_name}`", True),
+            ("Guild:", f"`{guild}`", True),
+        ])
 
     async def on_error(self, event: str, *args, **kwargs):
         _, error, error_traceback = sys.exc_info()
         formatted_error = ''.join(traceback.format_exception(type(error), error, error_traceback))
-        error_embed = discord.Embed(
-            title=error.__class__.__name__,
-            description=str(error),
-            color=discord.Color.red(),
-            timestamp=discord.utils.utcnow()
-        )
-        error_embed.add_field(name="Event:", value=f"```py\n{event}```", inline=True)
-        error_embed.add_field(name="Args:", value=f"```py\n{args}```", inline=True)
-        error_embed.add_field(name="KwArgs:", value=f"```py\n{kwargs}```", inline=True)
-        error_embed.add_field(name="Error:", value=f"```py\n{formatted_error}```", inline=False)
-        if len(error_embed.fields[2].value) > 1024:
-            error_embed.remove_field(2)
-            error_embed.add_field(
-                name="Error:",
-                value=f"```py\n{formatted_error[:1011]}```",
-                inline=False
+        self.error_reporter.report(error, formatted_error, [
+            ("Event:", f"```py\n{event}```", True),
+            ("Args:", f"```py\n{str(args)[:1015]}```", True),
+            ("KwArgs:", f"```py\n{str(kwargs)[:1015]}```", True),
+        ])
+
+    @staticmethod
+    def get_error_embeds(error: Exception, formatted_error: str,
+                         fields: list[tuple[str, str, bool]]) -> list[discord.Embed]:
+        """Gets the embeds of an error report, split to stay within Discord's embed limits.
+
+        Parameters
+        ----------
+        error: Exception
+            The error to report.
+        formatted_error: str
+            The formatted traceback of the error.
+        fields: list[tuple[str, str, bool]]
+            The names, values and inline flags of the fields to show before the traceback.
+
+        Returns
+        -------
+        list[discord.Embed]
+            The embeds of the error report."""
+        title = error.__class__.__name__
+        description = str(error)[:4096]
+        fields = fields + [
+            ("Error:" if i == 0 else "", f"```py\n{chunk}```", False)
+            for i, chunk in enumerate(core.pack_lines(formatted_error.splitlines(), 1015))
+        ]
+        error_embeds = []
+        for page in core.pack_fields(fields, len(title) + len(description))[:10]:
+            error_embed = discord.Embed(
+                title=title if not error_embeds else f"{title} (continued)",
+                description=description if not error_embeds else None,
+                color=discord.Color.red(),
+                timestamp=discord.utils.utcnow()
             )
-            for i in range(1011, len(formatted_error), 1011):
-                error_embed.add_field(
-                    name="",
-                    value=f"```py\n{formatted_error[i:i + 1011]}```",
-                    inline=False
-                )
-        return await self.errors_webhook.send(
-            embed=error_embed,
-            avatar_url=self.user.display_avatar.url
-        )
+            for name, value, inline in page:
+                error_embed.add_field(name=name, value=value, inline=inline)
+            error_embeds.append(error_embed)
+        return error_embeds
+
+    async def close(self):
+        try:
+            await core.flush_directory_edits()
+        except Exception as e:
+            print("".join(traceback.format_exception(type(e), e, e.__traceback__)))
+        self.error_reporter.stop()
+        self.outbox.stop()
+        if self.errors_webhook is not None:
+            await self.error_reporter.flush()
+        await super().close()
 
     def run(self, token: str):
+        memory_usage: int | None = core.get_memory_usage()
+        if memory_usage is not None:
+            print(f"Memory usage before startup: {memory_usage / 2 ** 20:.1f} MiB "
+                  f"(message cache profile: {core.config.message_cache_profile})")
         super().run(os.environ.get(token))
@@ -15,10 +15,51 @@ feedback_strings = [
     "<:Bastion:1138327109929025536>  Bastion Split",
     "<:Nether:1132644630576517190>  Going to Fortress",
     "<:Fortress:1138327332688511027>  Fortress Split",
-    "<:Triangulation:1138327300736290906>  Finding/Going to Stronghold"
+    "<:Triangulation:1138327300736290906>  Finding/Going to Stronghold",
     "<:Stronghold:1138327270625378324>  Stronghold Split",
     "<:End:1132644627506278451>  End Split",
     "<:Backseatega:933142144699494410> Reoccurring Themes",
     "<:YouTube:1191724962868904037> Feedback",
     "<:YouTube:1191724962868904037> Video Feedback"
 ]
+
+parent_id_cache_ttl = 3600
+parent_id_fetch_concurrency = 5
+
+directory_edit_delay = 5.0
+directory_edit_max_backoff = 300.0
+directory_reconcile_interval = 30
+
+ping_mentions_per_edit = 50
+role_mention_member_limit = 100
+onboarding_workers = 3
+
+thread_cleanup_concurrency = 5
+thread_cleanup_retries = 3
+
+guild_policy_path = "data/guilds.json"
+guild_policy_reload_interval = 60
+
+tag_path = "data/tags.json"
+tag_fuzzy_threshold = 0.25
+tag_fuzzy_candidates = 200
+tag_reload_interval = 60
+
+error_report_interval = 2.0
+error_fingerprint_frames = 3
+error_report_max_backoff = 300.0
+
+outbox_path = "data/outbox.sqlite3"
+outbox_interval = 5.0
+outbox_max_backoff = 300.0
+
+member_cache_policy = "lean"
+member_cache_size = 1000
+member_cache_prune_interval = 10
+
+startup_chunking = "targeted"
+member_snapshot_path = "data/members.json"
+role_index_ready_timeout = 30.0
+
+message_cache_profile = "lean"
+message_cache_size = 1000
@@ -0,0 +1,747 @@
+import asyncio
+import bisect
+import datetime
+import re
+import time
+import traceback
+from typing import NamedTuple
+
+import discord
+
+__all__ = (
+    "DirectoryActor",
+    "DirectoryOperation",
+    "DirectoryWriter",
+    "FeedbackThreadDirectory",
+    "flush_directory_edits",
+    "get_archived_thread_ids",
+    "get_directory_actor",
+    "get_feedback_thread_directory",
+    "get_thread_directory",
+    "is_waiting_for_feedback",
+    "parent_id_cache",
+    "ParentIdCache",
+    "reconcile_directory",
+    "submit_directory_operation",
+    "ThreadDirectory",
+)
+
+import core
+
+_feedback_line_pattern: re.Pattern = re.compile(r"<#(\d+)> - Waiting since <t:(\d+)(?::\w)?>")
+
+
+class ThreadDirectory:
+    """Represents the in-memory index of a guild's thread directory.
+
+    The index is loaded once from the thread directory message and updated incrementally afterwards, so adding or
+    removing a thread never has to parse the directory embed again."""
+
+    def __init__(self, guild_id: int, thread_ids: list[int] | None = None) -> None:
+        """Initialises a new thread directory index.
+
+        Parameters
+        ------------
+        guild_id: int
+            The id of the guild the thread directory belongs to.
+        thread_ids: list[int] | None
+            The thread ids the thread directory initially contains."""
+        self.guild_id: int = guild_id
+        self.thread_ids: dict[int, None] = dict.fromkeys(thread_ids or [])
+
+    def __contains__(self, thread_id: int) -> bool:
+        return thread_id in self.thread_ids
+
+    def __iter__(self):
+        return iter(self.thread_ids)
+
+    def __len__(self) -> int:
+        return len(self.thread_ids)
+
+    @classmethod
+    def from_messages(cls, guild_id: int, thread_dir_msgs: list[discord.Message]) -> "ThreadDirectory":
+        """Loads a thread directory index from the thread directory messages.
+
+        Parameters
+        ------------
+        guild_id: int
+            The id of the guild the thread directory belongs to.
+        thread_dir_msgs: list[discord.Message]
+            The thread directory messages to load the index from.
+
+        Returns
+        -----------
+        ThreadDirectory
+            The thread directory index."""
+        return cls(guild_id, [
+            int(line[4:-1]) for thread_dir_msg in thread_dir_msgs for embed in thread_dir_msg.embeds[:1]
+            for field in embed.fields for line in field.value.splitlines()
+        ])
+
+    def add(self, thread_id: int) -> bool:
+        """Adds a thread to the thread directory index.
+
+        Parameters
+        ------------
+        thread_id: int
+            The id of the thread to add.
+
+        Returns
+        -----------
+        bool
+            Whether the thread directory index changed."""
+        if thread_id in self.thread_ids:
+            return False
+        self.thread_ids[thread_id] = None
+        return True
+
+    async def get_embeds(self, guild: discord.Guild) -> list[discord.Embed]:
+        """Renders the thread directory embeds from the index.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild the thread directory belongs to.
+
+        Returns
+        -----------
+        list[discord.Embed]
+            The thread directory embeds, one for each directory message."""
+        thread_ids: list[int] = list(self.thread_ids)
+        thread_parent_ids: dict[int, int] = await core.resolve_parent_ids(thread_ids, guild)
+        return await core.utils.get_thread_directory_embeds(thread_parent_ids, thread_ids, guild)
+
+    def remove(self, thread_id: int) -> bool:
+        """Removes a thread from the thread directory index.
+
+        Parameters
+        ------------
+        thread_id: int
+            The id of the thread to remove.
+
+        Returns
+        -----------
+        bool
+            Whether the thread directory index changed."""
+        if thread_id not in self.thread_ids:
+            return False
+        del self.thread_ids[thread_id]
+        return True
+
+
+class FeedbackThreadDirectory:
+    """Represents the in-memory index of a guild's feedback thread directory.
+
+    The index keeps the time every feedback thread started waiting for feedback and a list of
+    ``(waiting_since, thread_id)`` records sorted by it, so the threads that have been waiting the longest always come
+    first."""
+
+    def __init__(self, guild_id: int, waiting_since: dict[int, datetime.datetime] | None = None) -> None:
+        """Initialises a new feedback thread directory index.
+
+        Parameters
+        ------------
+        guild_id: int
+            The id of the guild the feedback thread directory belongs to.
+        waiting_since: dict[int, datetime.datetime] | None
+            The times the feedback threads started waiting for feedback, keyed by thread id."""
+        self.guild_id: int = guild_id
+        self.waiting_since: dict[int, datetime.datetime] = waiting_since or {}
+        self.entries: list[tuple[datetime.datetime, int]] = sorted(
+            (since, thread_id) for thread_id, since in self.waiting_since.items()
+        )
+
+    def __contains__(self, thread_id: int) -> bool:
+        return thread_id in self.waiting_since
+
+    def __iter__(self):
+        return iter(self.waiting_since)
+
+    def __len__(self) -> int:
+        return len(self.waiting_since)
+
+    @classmethod
+    def from_messages(cls, guild_id: int, thread_dir_msgs: list[discord.Message]) -> "FeedbackThreadDirectory":
+        """Loads a feedback thread directory index from the thread directory messages.
+
+        Parameters
+        ------------
+        guild_id: int
+            The id of the guild the feedback thread directory belongs to.
+        thread_dir_msgs: list[discord.Message]
+            The thread directory messages to load the index from.
+
+        Returns
+        -----------
+        FeedbackThreadDirectory
+            The feedback thread directory index."""
+        waiting_since: dict[int, datetime.datetime] = {}
+        for thread_dir_msg in thread_dir_msgs:
+            for embed in thread_dir_msg.embeds[:1]:
+                for field in embed.fields:
+                    for match in _feedback_line_pattern.finditer(field.value):
+                        waiting_since[int(match.group(1))] = datetime.datetime.fromtimestamp(
+                            int(match.group(2)), tz=datetime.timezone.utc
+                        )
+        return cls(guild_id, waiting_since)
+
+    def add(self, thread_id: int, waiting_since: datetime.datetime | None = None) -> bool:
+        """Adds a feedback thread to the feedback thread directory index.
+
+        A feedback thread that is already in the index keeps the time it originally started waiting for feedback.
+
+        Parameters
+        ------------
+        thread_id: int
+            The id of the feedback thread to add.
+        waiting_since: datetime.datetime | None
+            The time the feedback thread started waiting for feedback, defaults to now.
+
+        Returns
+        -----------
+        bool
+            Whether the feedback thread directory index changed."""
+        if thread_id in self.waiting_since:
+            return False
+        since: datetime.datetime = (waiting_since or discord.utils.utcnow()).replace(microsecond=0)
+        self.waiting_since[thread_id] = since
+        bisect.insort(self.entries, (since, thread_id))
+        return True
+
+    def get_lines(self) -> list[str]:
+        """Renders the directory lines of the feedback threads, sorted by the time they have been waiting.
+
+        Returns
+        -----------
+        list[str]
+            The directory lines of the feedback threads."""
+        return [f"- <#{thread_id}> - Waiting since {discord.utils.format_dt(since, style='R')}"
+                for since, thread_id in self.entries]
+
+    async def get_embeds(self, guild: discord.Guild) -> list[discord.Embed]:
+        """Renders the feedback thread directory embeds from the index.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild the feedback thread directory belongs to.
+
+        Returns
+        -----------
+        list[discord.Embed]
+            The feedback thread directory embeds, one for each directory message."""
+        return await core.utils.get_feedback_thread_directory_embeds(self.get_lines(), guild)
+
+    def remove(self, thread_id: int) -> bool:
+        """Removes a feedback thread from the feedback thread directory index.
+
+        Parameters
+        ------------
+        thread_id: int
+            The id of the feedback thread to remove.
+
+        Returns
+        -----------
+        bool
+            Whether the feedback thread directory index changed."""
+        since: datetime.datetime | None = self.waiting_since.pop(thread_id, None)
+        if since is None:
+            return False
+        del self.entries[bisect.bisect_left(self.entries, (since, thread_id))]
+        return True
+
+
+class ParentIdCache:
+    """Represents a TTL cache of resolved thread parent ids shared by all thread directory operations.
+
+    The cache also counts where lookups were resolved from, so the share of cache hits versus REST fetches can be
+    inspected with ``/thread directory stats``, and remembers the threads a fetch found deleted, so the
+    reconciliation can drop them from the directories without fetching them again."""
+
+    def __init__(self, ttl: float) -> None:
+        """Initialises a new parent id cache.
+
+        Parameters
+        ------------
+        ttl: float
+            The number of seconds a resolved parent id stays cached."""
+        self.ttl: float = ttl
+        self.entries: dict[int, tuple[int, float]] = {}
+        self.stats: dict[str, int] = {"cache": 0, "gateway": 0, "active_threads": 0, "rest": 0}
+        self.deleted: set[int] = set()
+
+    def get(self, thread_id: int) -> int | None:
+        """Gets the cached parent id of a thread.
+
+        Parameters
+        ------------
+        thread_id: int
+            The id of the thread.
+
+        Returns
+        -----------
+        int | None
+            The parent id of the thread, or None if it isn't cached or has expired."""
+        entry: tuple[int, float] | None = self.entries.get(thread_id)
+        if entry is None:
+            return None
+        parent_id, expires_at = entry
+        if expires_at < time.monotonic():
+            del self.entries[thread_id]
+            return None
+        self.stats["cache"] += 1
+        return parent_id
+
+    def set(self, thread_id: int, parent_id: int) -> int:
+        """Caches the parent id of a thread.
+
+        Parameters
+        ------------
+        thread_id: int
+            The id of the thread.
+        parent_id: int
+            The id of the parent of the thread.
+
+        Returns
+        -----------
+        int
+            The parent id of the thread."""
+        self.entries[thread_id] = (parent_id, time.monotonic() + self.ttl)
+        return parent_id
+
+    def invalidate(self, thread_id: int) -> None:
+        """Removes the cached parent id of a thread.
+
+        Parameters
+        ------------
+        thread_id: int
+            The id of the thread."""
+        self.entries.pop(thread_id, None)
+
+    def mark_deleted(self, thread_id: int) -> None:
+        """Remembers that a thread no longer exists.
+
+        Parameters
+        ------------
+        thread_id: int
+            The id of the deleted thread."""
+        self.entries.pop(thread_id, None)
+        self.deleted.add(thread_id)
+
+
+class DirectoryWriter:
+    """Represents the write-behind buffer of a guild's thread directory messages.
+
+    Changes to the directory index are not written immediately. Instead, the first change schedules an edit after
+    ``config.directory_edit_delay`` seconds and every change made in the meantime is folded into that edit, which
+    renders the final state of the index. The directory is spread over as many messages as its embeds need and only
+    the messages whose content changed are edited."""
+
+    def __init__(self, guild: discord.Guild, delay: float) -> None:
+        """Initialises a new directory writer.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild the thread directory belongs to.
+        delay: float
+            The number of seconds changes are buffered before the directory messages are edited."""
+        self.guild: discord.Guild = guild
+        self.delay: float = delay
+        self.directory: ThreadDirectory | FeedbackThreadDirectory | None = None
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self.task: asyncio.Task | None = None
+        self.pages: dict[int, tuple] = {}
+
+    @staticmethod
+    def get_page(embed: discord.Embed) -> tuple:
+        """Gets the content of a directory embed, ignoring its timestamp.
+
+        Parameters
+        ------------
+        embed: discord.Embed
+            The directory embed.
+
+        Returns
+        -----------
+        tuple
+            The title, description and fields of the directory embed."""
+        return embed.title, embed.description, tuple((field.name, field.value.strip()) for field in embed.fields)
+
+    def get_written_page(self, thread_dir_msg: discord.Message | discord.PartialMessage) -> tuple | None:
+        """Gets the content last written to a directory message.
+
+        Parameters
+        ------------
+        thread_dir_msg: discord.Message | discord.PartialMessage
+            The directory message.
+
+        Returns
+        -----------
+        tuple | None
+            The content of the directory message, or None if it is unknown."""
+        if thread_dir_msg.id in self.pages:
+            return self.pages[thread_dir_msg.id]
+        if isinstance(thread_dir_msg, discord.Message) and thread_dir_msg.embeds:
+            return self.get_page(thread_dir_msg.embeds[0])
+        return None
+
+    def schedule(self, directory: ThreadDirectory | FeedbackThreadDirectory) -> None:
+        """Schedules an edit of the thread directory messages.
+
+        Parameters
+        ------------
+        directory: ThreadDirectory | FeedbackThreadDirectory
+            The directory index that changed."""
+        self.directory = directory
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        # changes made while the messages are edited can't schedule another flush, so flush until none are pending
+        failures: int = 0
+        while self.directory is not None:
+            await asyncio.sleep(min(self.delay * 2 ** min(failures, 16), core.config.directory_edit_max_backoff))
+            try:
+                await self.flush()
+            except Exception as e:
+                print("".join(traceback.format_exception(type(e), e, e.__traceback__)))
+                failures += 1
+            else:
+                failures = 0
+
+    async def flush(self) -> None:
+        """Edits the thread directory messages if there are pending changes.
+
+        Messages are sent when the directory grows and deleted when it shrinks. If an edit fails, the changes stay
+        pending, so they are written by the next flush.
+
+        Raises
+        -----------
+        discord.HTTPException
+            Editing, sending or deleting a directory message failed."""
+        async with self.lock:
+            directory, self.directory = self.directory, None
+            if directory is None:
+                return
+            try:
+                await self.write(directory)
+            except Exception:
+                if self.directory is None:
+                    self.directory = directory
+                raise
+
+    async def write(self, directory: ThreadDirectory | FeedbackThreadDirectory) -> None:
+        """Writes a directory index to the thread directory messages, editing only the messages that changed.
+
+        Parameters
+        ------------
+        directory: ThreadDirectory | FeedbackThreadDirectory
+            The directory index to write."""
+        thread_dir_msgs: list[discord.Message | discord.PartialMessage] | None = \
+            await core.utils.get_thread_dir_msgs(self.guild)
+        if thread_dir_msgs is None:
+            return
+        directory_embeds: list[discord.Embed] = await directory.get_embeds(self.guild)
+        for i, directory_embed in enumerate(directory_embeds):
+            page: tuple = self.get_page(directory_embed)
+            if i == len(thread_dir_msgs):
+                thread_dir_msgs.append(await thread_dir_msgs[0].channel.send(embed=directory_embed))
+            elif self.get_written_page(thread_dir_msgs[i]) != page:
+                await thread_dir_msgs[i].edit(embed=directory_embed, content=None)
+            self.pages[thread_dir_msgs[i].id] = page
+        while len(thread_dir_msgs) > len(directory_embeds):
+            await thread_dir_msgs[-1].delete()
+            self.pages.pop(thread_dir_msgs.pop().id, None)
+
+
+class DirectoryOperation(NamedTuple):
+    """Represents a queued change of a guild's thread directory."""
+
+    action: str
+    thread_id: int
+    feedback: bool
+    enqueued_at: float
+    waiting_since: datetime.datetime | None = None
+
+
+class DirectoryActor:
+    """Represents the task that serializes all thread directory changes of a guild.
+
+    Changes are queued by the event handlers without waiting and applied one by one, in order, against the in-memory
+    directory index by a single task per guild, so concurrent changes can't overwrite each other."""
+
+    def __init__(self, guild: discord.Guild) -> None:
+        """Initialises a new directory actor.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild the thread directory belongs to."""
+        self.guild: discord.Guild = guild
+        self.queue: asyncio.Queue[DirectoryOperation] = asyncio.Queue()
+        self.writer: DirectoryWriter = DirectoryWriter(guild, core.config.directory_edit_delay)
+        self.task: asyncio.Task | None = None
+        self.operations: int = 0
+        self.total_latency: float = 0.0
+        self.max_latency: float = 0.0
+
+    @property
+    def average_latency(self) -> float:
+        """The average number of seconds between queueing and applying an operation."""
+        return self.total_latency / self.operations if self.operations else 0.0
+
+    def submit(self, action: str, thread_id: int, feedback: bool,
+               waiting_since: datetime.datetime | None = None) -> None:
+        """Queues a change of the thread directory.
+
+        Parameters
+        ------------
+        action: str
+            The action to apply, either ``"add"`` or ``"remove"``.
+        thread_id: int
+            The id of the thread to add or remove.
+        feedback: bool
+            Whether the change targets the feedback thread directory.
+        waiting_since: datetime.datetime | None
+            The time a feedback thread started waiting for feedback, defaults to the time the change is applied."""
+        self.queue.put_nowait(DirectoryOperation(action, thread_id, feedback, time.monotonic(), waiting_since))
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        """Applies the queued changes in order."""
+        while True:
+            operation: DirectoryOperation = await self.queue.get()
+            try:
+                await self.apply(operation)
+            except Exception as e:
+                print("".join(traceback.format_exception(type(e), e, e.__traceback__)))
+            finally:
+                latency: float = time.monotonic() - operation.enqueued_at
+                self.operations += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+                self.queue.task_done()
+
+    async def apply(self, operation: DirectoryOperation) -> None:
+        """Applies a change to the directory index and schedules an edit of the directory message.
+
+        Parameters
+        ------------
+        operation: DirectoryOperation
+            The change to apply."""
+        thread_dir_msgs: list[discord.Message | discord.PartialMessage] | None = \
+            await core.utils.get_thread_dir_msgs(self.guild)
+        if thread_dir_msgs is None:
+            return
+        if operation.feedback:
+            directory: ThreadDirectory | FeedbackThreadDirectory = get_feedback_thread_directory(thread_dir_msgs)
+        else:
+            directory = get_thread_directory(thread_dir_msgs)
+        if operation.action == "add" and operation.feedback:
+            changed: bool = directory.add(operation.thread_id, operation.waiting_since)
+        elif operation.action == "add":
+            changed = directory.add(operation.thread_id)
+        else:
+            changed = directory.remove(operation.thread_id)
+        if changed:
+            self.writer.schedule(directory)
+
+
+parent_id_cache = ParentIdCache(core.config.parent_id_cache_ttl)
+
+_directory_actors: dict[int, DirectoryActor] = {}
+
+_thread_directories: dict[int, ThreadDirectory] = {}
+_feedback_thread_directories: dict[int, FeedbackThreadDirectory] = {}
+
+
+def get_directory_actor(guild_id: int) -> DirectoryActor | None:
+    """Gets the directory actor of a guild.
+
+    Parameters
+    ------------
+    guild_id: int
+        The id of the guild.
+
+    Returns
+    -----------
+    DirectoryActor | None
+        The directory actor of the guild, or None if its thread directory hasn't changed yet."""
+    return _directory_actors.get(guild_id)
+
+
+def get_feedback_thread_directory(
+        thread_dir_msgs: list[discord.Message | discord.PartialMessage]) -> FeedbackThreadDirectory:
+    """Gets the feedback thread directory index of a guild, loading it from the thread directory messages once.
+
+    Parameters
+    ------------
+    thread_dir_msgs: list[discord.Message | discord.PartialMessage]
+        The thread directory messages of the guild.
+
+    Returns
+    -----------
+    FeedbackThreadDirectory
+        The feedback thread directory index of the guild."""
+    guild_id: int = thread_dir_msgs[0].guild.id
+    if guild_id not in _feedback_thread_directories:
+        _feedback_thread_directories[guild_id] = FeedbackThreadDirectory.from_messages(guild_id, thread_dir_msgs)
+    return _feedback_thread_directories[guild_id]
+
+
+def get_thread_directory(thread_dir_msgs: list[discord.Message | discord.PartialMessage]) -> ThreadDirectory:
+    """Gets the thread directory index of a guild, loading it from the thread directory messages once.
+
+    Parameters
+    ------------
+    thread_dir_msgs: list[discord.Message | discord.PartialMessage]
+        The thread directory messages of the guild.
+
+    Returns
+    -----------
+    ThreadDirectory
+        The thread directory index of the guild."""
+    guild_id: int = thread_dir_msgs[0].guild.id
+    if guild_id not in _thread_directories:
+        _thread_directories[guild_id] = ThreadDirectory.from_messages(guild_id, thread_dir_msgs)
+    return _thread_directories[guild_id]
+
+
+async def flush_directory_edits() -> None:
+    """Applies all queued thread directory changes and immediately writes the pending edits, e.g. before the bot
+    shuts down. A failed edit is logged and doesn't keep the other guilds' edits from being written."""
+    for actor in _directory_actors.values():
+        if actor.task is not None and not actor.task.done():
+            await actor.queue.join()
+        try:
+            await actor.writer.flush()
+        except Exception as e:
+            print("".join(traceback.format_exception(type(e), e, e.__traceback__)))
+
+
+async def reconcile_directory(guild: discord.Guild) -> tuple[list[int], list[int]] | None:
+    """Repairs the thread directory of a guild after it drifted, e.g. while the bot was offline.
+
+    The active threads of the guild are fetched in a single request and compared to the directory index. Feedback
+    threads that are waiting for feedback but missing from the directory are added, and threads that stopped waiting
+    for feedback are removed. Inactive threads are never fetched one by one. Inactive feedback threads are looked up in
+    the archived threads of their forum, listed in bulk, and removed if they are neither active nor archived. Other
+    inactive threads are removed once a directory render found them deleted. Threads deleted while the bot is online
+    are removed by their delete event. All changes are queued at once, so they are written in a single edit.
+
+    Parameters
+    ------------
+    guild: discord.Guild
+        The guild to reconcile the thread directory of.
+
+    Returns
+    -----------
+    tuple[list[int], list[int]] | None
+        The ids of the added and removed threads, or None if the guild has no thread directory."""
+    thread_dir_msgs: list[discord.Message | discord.PartialMessage] | None = \
+        await core.utils.get_thread_dir_msgs(guild)
+    if thread_dir_msgs is None:
+        return None
+    feedback: bool = guild.id == core.config.rip_guild_id
+    if feedback:
+        directory: ThreadDirectory | FeedbackThreadDirectory = get_feedback_thread_directory(thread_dir_msgs)
+    else:
+        directory = get_thread_directory(thread_dir_msgs)
+    active_threads: dict[int, discord.Thread] = {thread.id: thread for thread in await guild.active_threads()}
+    added_ids: list[int] = []
+    removed_ids: list[int] = []
+    if feedback:
+        added_ids.extend(thread_id for thread_id, thread in active_threads.items()
+                         if thread_id not in directory and is_waiting_for_feedback(thread))
+        removed_ids.extend(thread_id for thread_id in directory
+                           if thread_id in active_threads and not is_waiting_for_feedback(active_threads[thread_id]))
+    inactive_ids: set[int] = {thread_id for thread_id in directory if thread_id not in active_threads}
+    if feedback and inactive_ids:
+        archived_ids: set[int] | None = await get_archived_thread_ids(guild, inactive_ids)
+        if archived_ids is not None:
+            removed_ids.extend(inactive_ids - archived_ids)
+    else:
+        removed_ids.extend(thread_id for thread_id in inactive_ids if thread_id in parent_id_cache.deleted)
+    parent_id_cache.deleted.difference_update(removed_ids)
+
+    for thread_id in added_ids:
+        submit_directory_operation(guild, "add", thread_id, feedback, active_threads[thread_id].created_at)
+    for thread_id in removed_ids:
+        submit_directory_operation(guild, "remove", thread_id, feedback)
+    return added_ids, removed_ids
+
+
+async def get_archived_thread_ids(guild: discord.Guild, thread_ids: set[int]) -> set[int] | None:
+    """Gets which of the threads specified are archived by listing the archived threads of their parents in bulk.
+
+    The feedback channel and the cached parents of the threads are listed, newest archived threads first, until all
+    threads were found. Threads whose cached parent can't be listed count as archived, so they aren't removed.
+
+    Parameters
+    ------------
+    guild: discord.Guild
+        The guild the threads belong to.
+    thread_ids: set[int]
+        The ids of the threads to look for.
+
+    Returns
+    -----------
+    set[int] | None
+        The ids of the threads that were found archived, or None if the feedback channel can't be listed."""
+    parent_ids: dict[int, set[int]] = {core.config.feedback_channel_id: set()}
+    for thread_id in thread_ids:
+        if thread_id in parent_id_cache.entries:
+            parent_ids.setdefault(parent_id_cache.entries[thread_id][0], set()).add(thread_id)
+    archived_ids: set[int] = set()
+    for parent_id, parent_thread_ids in parent_ids.items():
+        parent: discord.abc.GuildChannel | None = guild.get_channel(parent_id)
+        if not isinstance(parent, (discord.TextChannel, discord.ForumChannel)):
+            if parent_id == core.config.feedback_channel_id:
+                return None
+            archived_ids |= parent_thread_ids
+            continue
+        async for thread in parent.archived_threads(limit=None):
+            if thread.id in thread_ids:
+                archived_ids.add(thread.id)
+                if len(archived_ids) == len(thread_ids):
+                    return archived_ids
+    return archived_ids
+
+
+def is_waiting_for_feedback(thread: discord.Thread) -> bool:
+    """Checks if a thread is waiting for feedback and therefore belongs in the feedback thread directory.
+
+    Parameters
+    ------------
+    thread: discord.Thread
+        The thread to check.
+
+    Returns
+    -----------
+    bool
+        Whether the thread is waiting for feedback."""
+    return core.is_valid_thread(thread) and thread.parent_id != core.config.rip_ticket_channel_id and \
+        core.config.bell_tag_id in [tag.id for tag in thread.applied_tags]
+
+
+def submit_directory_operation(guild: discord.Guild, action: str, thread_id: int, feedback: bool = False,
+                               waiting_since: datetime.datetime | None = None) -> None:
+    """Queues a change of a guild's thread directory without waiting for it to be applied.
+
+    Parameters
+    ------------
+    guild: discord.Guild
+        The guild the thread directory belongs to.
+    action: str
+        The action to apply, either ``"add"`` or ``"remove"``.
+    thread_id: int
+        The id of the thread to add or remove.
+    feedback: bool
+        Whether the change targets the feedback thread directory.
+    waiting_since: datetime.datetime | None
+        The time a feedback thread started waiting for feedback, defaults to the time the change is applied."""
+    if guild.id not in _directory_actors:
+        _directory_actors[guild.id] = DirectoryActor(guild)
+    _directory_actors[guild.id].submit(action, thread_id, feedback, waiting_since)
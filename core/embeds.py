@@ -1,4 +1,6 @@
 import datetime
+import types
+from typing import NamedTuple
 
 import discord
 
@@ -260,6 +262,40 @@ class HelpSelectEmbed(GreenEmbed):
         )
 
 
+class HelpCatalog(NamedTuple):
+    """Represents the pre-rendered help of all command categories.
+
+    The catalog is built once the commands are synced, since the command mentions need their ids, and is rebuilt
+    after cogs are loaded or unloaded. The rendered embeds are shared between invocations and must not be
+    modified."""
+    options: tuple[discord.SelectOption, ...]
+    embeds: types.MappingProxyType[str, discord.Embed]
+
+    @classmethod
+    def build(cls, bot: AimBot) -> "HelpCatalog":
+        """Builds the help catalog from the cogs of a bot.
+
+        Parameters
+        ----------
+        bot: :class:`AimBot`
+            The bot instance.
+
+        Returns
+        -------
+        :class:`HelpCatalog`
+            The help catalog."""
+        options: list[discord.SelectOption] = []
+        embeds: dict[str, discord.Embed] = {}
+        for cog_name, cog in bot.cogs.items():
+            if not cog.__cog_commands__ or cog_name in ["Help"]:
+                continue
+            options.append(discord.SelectOption(label=cog_name, description=cog.__doc__))
+            help_select_embed = HelpSelectEmbed(cog=cog)
+            help_select_embed.timestamp = None
+            embeds[cog_name] = help_select_embed
+        return cls(tuple(options), types.MappingProxyType(embeds))
+
+
 class HelpSelect(discord.ui.Select):
     """Represents a custom PyCord UI help select menu."""
 
@@ -273,14 +309,7 @@ class HelpSelect(discord.ui.Select):
         self.cog: Cog = cog
         super().__init__(
             placeholder="Choose a category",
-            options=[
-                discord.SelectOption(
-                    label=cog_name,
-                    description=cog.__doc__,
-                )
-                for cog_name, cog in self.cog.bot.cogs.items()
-                if cog.__cog_commands__ and cog_name not in ["Help"]
-            ],
+            options=list(self.cog.bot.get_help_catalog().options),
         )
 
     async def callback(self, interaction: discord.Interaction) -> None:
@@ -290,8 +319,12 @@ class HelpSelect(discord.ui.Select):
         ----------
         interaction: :class:`discord.Interaction`
             The interaction instance."""
-        cog = self.cog.bot.get_cog(self.values[0])
-        embed = HelpSelectEmbed(cog=cog)
+        embed: discord.Embed | None = self.cog.bot.get_help_catalog().embeds.get(self.values[0])
+        if embed is None:
+            embed = RedEmbed(
+                title="Category not found",
+                description=f"Category `{self.values[0]}` not found!"
+            )
         await interaction.response.send_message(
             embed=embed,
             ephemeral=True,
@@ -0,0 +1,202 @@
+import asyncio
+import datetime
+import traceback
+
+import aiohttp
+import discord
+
+__all__ = (
+    "ErrorReport",
+    "ErrorReporter",
+)
+
+import core
+
+
+class ErrorReport:
+    """Represents a pending error report, counting the repeats of the error until it is sent."""
+
+    def __init__(self, fingerprint: tuple[str, ...], error: Exception, formatted_error: str,
+                 fields: list[tuple[str, str, bool]]) -> None:
+        """Initialises a new error report.
+
+        Parameters
+        ------------
+        fingerprint: tuple[str, ...]
+            The fingerprint identifying repeats of the error.
+        error: Exception
+            The error to report.
+        formatted_error: str
+            The formatted traceback of the error.
+        fields: list[tuple[str, str, bool]]
+            The names, values and inline flags of the fields to show before the traceback."""
+        self.fingerprint: tuple[str, ...] = fingerprint
+        self.error: Exception = error
+        self.formatted_error: str = formatted_error
+        self.fields: list[tuple[str, str, bool]] = fields
+        self.count: int = 1
+        self.first_seen: datetime.datetime = discord.utils.utcnow()
+        self.last_seen: datetime.datetime = self.first_seen
+
+
+class ErrorReporter:
+    """Represents the queue of error reports sent to the errors webhook.
+
+    Reporting an error only records it, a background task sends the reports one at a time and waits between sends to
+    stay within the webhook's rate limit. Errors with the same type and innermost frames are collapsed into the
+    pending report with a count, so a failing event can't flood the webhook or slow down the handlers."""
+
+    def __init__(self, bot: discord.Bot, interval: float, frames: int, max_backoff: float,
+                 max_reports: int = 100) -> None:
+        """Initialises a new error reporter.
+
+        Parameters
+        ------------
+        bot: discord.Bot
+            The bot whose errors webhook the reports are sent to.
+        interval: float
+            The number of seconds to wait for repeats before sending and between two sends.
+        frames: int
+            The number of innermost traceback frames that identify an error.
+        max_backoff: float
+            The maximum number of seconds to wait before retrying after the webhook couldn't be reached.
+        max_reports: int
+            The number of distinct pending reports, errors beyond it are dropped."""
+        self.bot: discord.Bot = bot
+        self.interval: float = interval
+        self.frames: int = frames
+        self.max_backoff: float = max_backoff
+        self.max_reports: int = max_reports
+        self.failures: int = 0
+        self.reports: dict[tuple[str, ...], ErrorReport] = {}
+        self.pending: asyncio.Event = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.stats: dict[str, int] = {"reported": 0, "collapsed": 0, "dropped": 0, "sent": 0}
+
+    def get_fingerprint(self, error: Exception) -> tuple[str, ...]:
+        """Gets the fingerprint of an error from its type and innermost traceback frames.
+
+        Parameters
+        ------------
+        error: Exception
+            The error to get the fingerprint of.
+
+        Returns
+        -----------
+        tuple[str, ...]
+            The fingerprint of the error."""
+        frames: traceback.StackSummary = traceback.extract_tb(error.__traceback__)
+        return (
+            f"{type(error).__module__}.{type(error).__qualname__}",
+            *(f"{frame.filename}:{frame.lineno}:{frame.name}" for frame in frames[-self.frames:])
+        )
+
+    def report(self, error: Exception, formatted_error: str, fields: list[tuple[str, str, bool]]) -> None:
+        """Queues the report of an error without waiting for it to be sent.
+
+        Parameters
+        ------------
+        error: Exception
+            The error to report.
+        formatted_error: str
+            The formatted traceback of the error.
+        fields: list[tuple[str, str, bool]]
+            The names, values and inline flags of the fields to show before the traceback."""
+        self.stats["reported"] += 1
+        fingerprint: tuple[str, ...] = self.get_fingerprint(error)
+        report: ErrorReport | None = self.reports.get(fingerprint)
+        if report is not None:
+            report.count += 1
+            report.last_seen = discord.utils.utcnow()
+            self.stats["collapsed"] += 1
+            return
+        if len(self.reports) >= self.max_reports:
+            self.stats["dropped"] += 1
+            return
+        self.reports[fingerprint] = ErrorReport(fingerprint, error, formatted_error, fields)
+        self.pending.set()
+
+    def start(self) -> None:
+        """Starts sending the reports if it isn't running yet."""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self) -> None:
+        """Stops sending the reports."""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self) -> None:
+        """Waits for reports, collects their repeats for a while and sends them.
+
+        Reports left over because the webhook couldn't be reached are retried with exponential backoff."""
+        while True:
+            await self.pending.wait()
+            self.pending.clear()
+            await asyncio.sleep(min(self.interval * 2 ** min(self.failures, 16), self.max_backoff))
+            try:
+                await self.flush()
+            except Exception as e:
+                print("".join(traceback.format_exception(type(e), e, e.__traceback__)))
+            if self.reports:
+                self.pending.set()
+
+    def requeue(self, report: ErrorReport) -> None:
+        """Puts a report that couldn't be sent back at the front of the queue, merging the repeats since.
+
+        Parameters
+        ------------
+        report: ErrorReport
+            The report to put back."""
+        pending_report: ErrorReport | None = self.reports.pop(report.fingerprint, None)
+        if pending_report is not None:
+            report.count += pending_report.count
+            report.last_seen = pending_report.last_seen
+        self.reports = {report.fingerprint: report, **self.reports}
+
+    async def flush(self) -> None:
+        """Sends all pending reports, one at a time.
+
+        Rate limited reports are put back and sent after the others. If the webhook can't be reached, the report is
+        put back and sending stops until the next retry."""
+        while self.reports:
+            report: ErrorReport = self.reports.pop(next(iter(self.reports)))
+            try:
+                await self.send(report)
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    print("".join(traceback.format_exception(type(e), e, e.__traceback__)))
+                    continue
+                self.requeue(report)
+            except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as e:
+                print(f"Failed to send an error report, retrying later: "
+                      f"{''.join(traceback.format_exception_only(type(e), e)).strip()}")
+                self.requeue(report)
+                self.failures += 1
+                return
+            else:
+                self.stats["sent"] += 1
+                self.failures = 0
+            await asyncio.sleep(self.interval)
+
+    async def send(self, report: ErrorReport) -> None:
+        """Sends a report to the errors webhook, split over as many messages as its embeds need.
+
+        Parameters
+        ------------
+        report: ErrorReport
+            The report to send."""
+        fields: list[tuple[str, str, bool]] = report.fields
+        if report.count > 1:
+            fields = fields + [(
+                "Occurrences:",
+                f"{report.count} times between {discord.utils.format_dt(report.first_seen, style='T')} and "
+                f"{discord.utils.format_dt(report.last_seen, style='T')}",
+                False
+            )]
+        for error_embeds in core.pack_embeds(self.bot.get_error_embeds(report.error, report.formatted_error, fields)):
+            await self.bot.errors_webhook.send(
+                embeds=error_embeds,
+                avatar_url=self.bot.user.display_avatar.url
+            )
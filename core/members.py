@@ -0,0 +1,397 @@
+import asyncio
+import collections
+import json
+import os
+
+import discord
+
+__all__ = (
+    "member_cache",
+    "MemberCachePolicy",
+    "role_index",
+    "RoleIndex",
+    "thread_owner_index",
+    "ThreadOwnerIndex",
+)
+
+import core
+
+
+class RoleIndex:
+    """Represents an index of the members holding each role.
+
+    The index is built once from the member cache after the guilds were chunked, or from the members requested by
+    a targeted startup, and kept up to date from member events, so finding the holders of a role costs O(holders)
+    instead of a scan of every member of the guild. Features that need the index wait until it is ready."""
+
+    def __init__(self) -> None:
+        """Initialises a new, empty role index."""
+        self.holders: dict[int, set[int]] = {}
+        self.ready: dict[int, asyncio.Event] = {}
+
+    def build(self, guild: discord.Guild, members: list[discord.Member] | None = None) -> None:
+        """Builds the index for the members of a guild and marks it as ready.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild to index the members of.
+        members: list[discord.Member] | None
+            The members to index, all cached members of the guild if not given."""
+        for role in guild.roles:
+            self.holders[role.id] = set()
+        for member in guild.members if members is None else members:
+            self.add_member(member)
+        self.get_ready_event(guild.id).set()
+
+    async def build_targeted(self, guild: discord.Guild, member_ids: list[int]) -> None:
+        """Requests only the members specified from the gateway, 100 at a time, and builds the index from them.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild to index the members of.
+        member_ids: list[int]
+            The ids of the members to request, e.g. the previous holders of the ping and mod roles."""
+        members: list[discord.Member] = []
+        for i in range(0, len(member_ids), 100):
+            members += await guild.query_members(user_ids=member_ids[i:i + 100], limit=100, cache=True)
+        self.build(guild, members)
+
+    def get_ready_event(self, guild_id: int) -> asyncio.Event:
+        """Gets the event that is set once the index of a guild is ready.
+
+        Parameters
+        ------------
+        guild_id: int
+            The id of the guild.
+
+        Returns
+        -----------
+        asyncio.Event
+            The readiness event of the guild."""
+        return self.ready.setdefault(guild_id, asyncio.Event())
+
+    def is_ready(self, guild_id: int) -> bool:
+        """Checks if the index of a guild is ready.
+
+        Parameters
+        ------------
+        guild_id: int
+            The id of the guild.
+
+        Returns
+        -----------
+        bool
+            Whether the index of the guild is ready."""
+        return guild_id in self.ready and self.ready[guild_id].is_set()
+
+    async def wait_until_ready(self, guild_id: int, timeout: float | None = None) -> bool:
+        """Waits until the index of a guild is ready.
+
+        Parameters
+        ------------
+        guild_id: int
+            The id of the guild.
+        timeout: float | None
+            The maximum number of seconds to wait, or None to wait until the index is ready.
+
+        Returns
+        -----------
+        bool
+            Whether the index of the guild is ready."""
+        try:
+            await asyncio.wait_for(self.get_ready_event(guild_id).wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def add_member(self, member: discord.Member) -> None:
+        """Adds a member to the holders of their roles.
+
+        Parameters
+        ------------
+        member: discord.Member
+            The member to add."""
+        for role in member.roles:
+            self.holders.setdefault(role.id, set()).add(member.id)
+
+    def update_member(self, before: discord.Member, after: discord.Member) -> None:
+        """Moves a member between the holders of the roles that were added or removed.
+
+        Parameters
+        ------------
+        before: discord.Member
+            The member before the update.
+        after: discord.Member
+            The member after the update."""
+        before_role_ids: set[int] = {role.id for role in before.roles}
+        after_role_ids: set[int] = {role.id for role in after.roles}
+        for role_id in before_role_ids - after_role_ids:
+            self.holders.get(role_id, set()).discard(after.id)
+        for role_id in after_role_ids - before_role_ids:
+            self.holders.setdefault(role_id, set()).add(after.id)
+
+    def remove_member(self, guild: discord.Guild, user_id: int) -> None:
+        """Removes a member from the holders of all roles of a guild.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild the member left.
+        user_id: int
+            The id of the member."""
+        for role in guild.roles:
+            self.holders.get(role.id, set()).discard(user_id)
+
+    def get_holders(self, role_id: int) -> set[int]:
+        """Gets the ids of the members holding a role.
+
+        Parameters
+        ------------
+        role_id: int
+            The id of the role.
+
+        Returns
+        -----------
+        set[int]
+            The ids of the members holding the role."""
+        return self.holders.get(role_id, set())
+
+
+class ThreadOwnerIndex:
+    """Represents an index of the active threads each member owns.
+
+    The index mirrors the active threads of the thread cache and is kept up to date from thread events, so the
+    threads of a member who left can be found without walking every thread of the guild."""
+
+    def __init__(self) -> None:
+        """Initialises a new, empty thread owner index."""
+        self.threads: dict[int, set[int]] = {}
+
+    def build(self, guild: discord.Guild) -> None:
+        """Builds the index for all active threads of a guild.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild to index the threads of."""
+        for thread in guild.threads:
+            self.add_thread(thread)
+
+    def add_thread(self, thread: discord.Thread) -> None:
+        """Adds a thread to the threads of its owner.
+
+        Parameters
+        ------------
+        thread: discord.Thread
+            The thread to add."""
+        self.threads.setdefault(thread.owner_id, set()).add(thread.id)
+
+    def update_thread(self, thread: discord.Thread) -> None:
+        """Adds or removes a thread depending on whether it is still active.
+
+        Parameters
+        ------------
+        thread: discord.Thread
+            The thread after the update."""
+        if thread.archived:
+            self.remove_thread(thread)
+        else:
+            self.add_thread(thread)
+
+    def remove_thread(self, thread: discord.Thread) -> None:
+        """Removes a thread from the threads of its owner.
+
+        Parameters
+        ------------
+        thread: discord.Thread
+            The thread to remove."""
+        thread_ids: set[int] | None = self.threads.get(thread.owner_id)
+        if thread_ids is None:
+            return
+        thread_ids.discard(thread.id)
+        if not thread_ids:
+            del self.threads[thread.owner_id]
+
+    def get_threads(self, guild: discord.Guild, owner_id: int) -> list[discord.Thread]:
+        """Gets the active threads a member owns in a guild.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild to get the threads of.
+        owner_id: int
+            The id of the member.
+
+        Returns
+        -----------
+        list[discord.Thread]
+            The active threads the member owns in the guild."""
+        return [thread for thread_id in self.threads.get(owner_id, set())
+                if (thread := guild.get_thread(thread_id)) is not None]
+
+
+class MemberCachePolicy:
+    """Represents the policy deciding which members stay in the member cache.
+
+    In lean mode only the holders of the ping and mod roles and the bot itself stay resident. Other members py-cord
+    caches, e.g. because they joined or were updated, are kept in a small LRU and evicted once it's full, instead of
+    keeping every member of every guild after the startup chunking. No feature needs other members as full member
+    objects, ``add_members`` uses the role index, thread owners are tracked by id and ``/user info`` gets the member
+    from the interaction. In full mode nothing is evicted."""
+
+    def __init__(self, lean: bool, max_members: int) -> None:
+        """Initialises a new member cache policy.
+
+        Parameters
+        ------------
+        lean: bool
+            Whether only the members the bot uses are kept.
+        max_members: int
+            The number of other members kept in the LRU."""
+        self.lean: bool = lean
+        self.max_members: int = max_members
+        self.members: collections.OrderedDict[tuple[int, int], discord.Guild] = collections.OrderedDict()
+
+    @staticmethod
+    def get_resident_role_ids(guild: discord.Guild) -> set[int]:
+        """Gets the ids of the roles whose holders stay resident in a guild.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild to get the resident roles of.
+
+        Returns
+        -----------
+        set[int]
+            The ids of the ping and mod roles of the guild."""
+        role_ids: set[int] = {core.config.rip_mod_role_id}
+        ping_role_id: int | None = core.guild_policies.ping_role_ids.get(guild.id)
+        if ping_role_id is not None:
+            role_ids.add(ping_role_id)
+        return role_ids
+
+    def is_resident(self, member: discord.Member, resident_role_ids: set[int] | None = None) -> bool:
+        """Checks if a member stays resident in the member cache.
+
+        Parameters
+        ------------
+        member: discord.Member
+            The member to check.
+        resident_role_ids: set[int] | None
+            The ids of the resident roles of the member's guild, looked up if not given.
+
+        Returns
+        -----------
+        bool
+            Whether the member stays resident."""
+        if member.id == member.guild.me.id:
+            return True
+        if resident_role_ids is None:
+            resident_role_ids = self.get_resident_role_ids(member.guild)
+        return any(role.id in resident_role_ids for role in member.roles)
+
+    def touch(self, member: discord.Member) -> None:
+        """Marks a cached member as recently used, evicting the least recently used members once the LRU is full.
+
+        Parameters
+        ------------
+        member: discord.Member
+            The member that was used."""
+        if not self.lean:
+            return
+        key: tuple[int, int] = (member.guild.id, member.id)
+        if self.is_resident(member):
+            self.members.pop(key, None)
+            return
+        self.members[key] = member.guild
+        self.members.move_to_end(key)
+        while len(self.members) > self.max_members:
+            (_, member_id), guild = self.members.popitem(last=False)
+            evicted_member: discord.Member | None = guild.get_member(member_id)
+            if evicted_member is not None and not self.is_resident(evicted_member):
+                # noinspection PyProtectedMember
+                guild._remove_member(evicted_member)
+
+    def prune(self, guild: discord.Guild) -> int:
+        """Evicts the cached members of a guild that are neither resident nor in the LRU.
+
+        Members py-cord cached without an event, e.g. after an update of an uncached member, are added to the role
+        index before they are evicted, so roles they gained while uncached aren't missed.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild to prune the member cache of.
+
+        Returns
+        -----------
+        int
+            The number of evicted members."""
+        if not self.lean:
+            return 0
+        resident_role_ids: set[int] = self.get_resident_role_ids(guild)
+        evicted: int = 0
+        for member in list(guild.members):
+            if (guild.id, member.id) in self.members or self.is_resident(member, resident_role_ids):
+                continue
+            role_index.add_member(member)
+            # noinspection PyProtectedMember
+            guild._remove_member(member)
+            evicted += 1
+        return evicted
+
+    def get_resident_member_ids(self, guild: discord.Guild) -> list[int]:
+        """Gets the ids of the indexed holders of the resident roles of a guild.
+
+        Parameters
+        ------------
+        guild: discord.Guild
+            The guild to get the resident members of.
+
+        Returns
+        -----------
+        list[int]
+            The ids of the resident members."""
+        member_ids: set[int] = set()
+        for role_id in self.get_resident_role_ids(guild):
+            member_ids |= role_index.get_holders(role_id)
+        return sorted(member_ids)
+
+    @staticmethod
+    def load_snapshot() -> dict[int, list[int]]:
+        """Loads the ids of the resident members saved by the last run, which a targeted startup requests.
+
+        Returns
+        -----------
+        dict[int, list[int]]
+            The ids of the resident members of each guild, empty if there is no valid snapshot."""
+        try:
+            with open(core.config.member_snapshot_path, encoding="utf-8") as file:
+                return {int(guild_id): [int(member_id) for member_id in member_ids]
+                        for guild_id, member_ids in json.load(file).items()}
+        except (OSError, ValueError, AttributeError, TypeError):
+            return {}
+
+    def save_snapshot(self, guilds: list[discord.Guild]) -> None:
+        """Saves the ids of the resident members of the guilds whose role index is ready, replacing the file atomically.
+
+        Parameters
+        ------------
+        guilds: list[discord.Guild]
+            The guilds to save the resident members of."""
+        snapshot: dict[int, list[int]] = self.load_snapshot()
+        for guild in guilds:
+            if role_index.is_ready(guild.id):
+                snapshot[guild.id] = self.get_resident_member_ids(guild)
+        temporary_path: str = f"{core.config.member_snapshot_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({str(guild_id): member_ids for guild_id, member_ids in snapshot.items()}, file)
+        os.replace(temporary_path, core.config.member_snapshot_path)
+
+
+role_index = RoleIndex()
+thread_owner_index = ThreadOwnerIndex()
+member_cache = MemberCachePolicy(core.config.member_cache_policy == "lean", core.config.member_cache_size)
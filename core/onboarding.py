@@ -0,0 +1,155 @@
+import asyncio
+import collections
+import datetime
+from typing import Awaitable, Callable
+
+import discord
+
+__all__ = (
+    "OnboardingJob",
+    "OnboardingQueue",
+)
+
+
+class OnboardingJob:
+    """Represents the onboarding of a thread, e.g. setting its auto-archive duration and adding members to it."""
+
+    def __init__(self, thread: discord.Thread, onboard: Callable[[discord.Thread], Awaitable[None]]) -> None:
+        """Initialises a new onboarding job.
+
+        Parameters
+        ------------
+        thread: discord.Thread
+            The thread to onboard.
+        onboard: Callable[[discord.Thread], Awaitable[None]]
+            The coroutine function that onboards the thread."""
+        self.thread: discord.Thread = thread
+        self.onboard: Callable[[discord.Thread], Awaitable[None]] = onboard
+        self.status: str = "queued"
+        self.enqueued_at: datetime.datetime = discord.utils.utcnow()
+        self.started_at: datetime.datetime | None = None
+        self.finished_at: datetime.datetime | None = None
+
+
+class OnboardingQueue:
+    """Represents the queue of thread onboarding jobs.
+
+    Event handlers only queue jobs. A fixed number of workers run them, taking turns between guilds so a burst of
+    threads in one guild can't starve the others. This keeps the number of concurrent requests bounded during
+    spikes."""
+
+    def __init__(self, bot: discord.Bot, workers: int, max_jobs: int = 1000) -> None:
+        """Initialises a new onboarding queue.
+
+        Parameters
+        ------------
+        bot: discord.Bot
+            The bot the onboarding jobs run for.
+        workers: int
+            The number of jobs that run at the same time.
+        max_jobs: int
+            The number of jobs whose status is remembered."""
+        self.bot: discord.Bot = bot
+        self.workers: int = workers
+        self.max_jobs: int = max_jobs
+        self.jobs: collections.OrderedDict[int, OnboardingJob] = collections.OrderedDict()
+        self.guild_queues: dict[int, collections.deque[OnboardingJob]] = {}
+        self.guild_order: collections.deque[int] = collections.deque()
+        self.pending: asyncio.Semaphore = asyncio.Semaphore(0)
+        self.tasks: list[asyncio.Task] = []
+
+    @property
+    def queued(self) -> int:
+        """The number of jobs waiting to run."""
+        return sum(len(queue) for queue in self.guild_queues.values())
+
+    @property
+    def running(self) -> int:
+        """The number of jobs that are running."""
+        return sum(job.status == "running" for job in self.jobs.values())
+
+    def submit(self, thread: discord.Thread, onboard: Callable[[discord.Thread], Awaitable[None]]) -> OnboardingJob:
+        """Queues the onboarding of a thread.
+
+        Parameters
+        ------------
+        thread: discord.Thread
+            The thread to onboard.
+        onboard: Callable[[discord.Thread], Awaitable[None]]
+            The coroutine function that onboards the thread.
+
+        Returns
+        -----------
+        OnboardingJob
+            The queued job."""
+        job = OnboardingJob(thread, onboard)
+        self.jobs.pop(thread.id, None)
+        self.jobs[thread.id] = job
+        while len(self.jobs) > self.max_jobs:
+            self.jobs.popitem(last=False)
+        if thread.guild.id not in self.guild_queues:
+            self.guild_queues[thread.guild.id] = collections.deque()
+            self.guild_order.append(thread.guild.id)
+        self.guild_queues[thread.guild.id].append(job)
+        self.pending.release()
+        self.start()
+        return job
+
+    def get_job(self, thread_id: int) -> OnboardingJob | None:
+        """Gets the latest onboarding job of a thread.
+
+        Parameters
+        ------------
+        thread_id: int
+            The id of the thread.
+
+        Returns
+        -----------
+        OnboardingJob | None
+            The latest onboarding job of the thread, or None if it wasn't onboarded recently."""
+        return self.jobs.get(thread_id)
+
+    def start(self) -> None:
+        """Starts the workers if they aren't running yet."""
+        self.tasks = [task for task in self.tasks if not task.done()]
+        for _ in range(self.workers - len(self.tasks)):
+            self.tasks.append(asyncio.create_task(self.work()))
+
+    def stop(self) -> None:
+        """Stops the workers."""
+        for task in self.tasks:
+            task.cancel()
+        self.tasks.clear()
+
+    async def next_job(self) -> OnboardingJob:
+        """Waits for the next job, taking turns between the guilds that have queued jobs.
+
+        Returns
+        -----------
+        OnboardingJob
+            The next job to run."""
+        await self.pending.acquire()
+        guild_id: int = self.guild_order.popleft()
+        queue: collections.deque[OnboardingJob] = self.guild_queues[guild_id]
+        job: OnboardingJob = queue.popleft()
+        if queue:
+            self.guild_order.append(guild_id)
+        else:
+            del self.guild_queues[guild_id]
+        return job
+
+    async def work(self) -> None:
+        """Runs queued jobs one after another."""
+        while True:
+            job: OnboardingJob = await self.next_job()
+            job.status = "running"
+            job.started_at = discord.utils.utcnow()
+            try:
+                await job.onboard(job.thread)
+            except Exception:
+                job.status = "failed"
+                await self.bot.on_error("onboarding", job.thread)
+            else:
+                job.status = "done"
+            finally:
+                job.finished_at = discord.utils.utcnow()
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import sqlite3
+import time
+import traceback
+
+import aiohttp
+import discord
+
+__all__ = (
+    "Outbox",
+)
+
+
+class Outbox:
+    """Represents a durable outbox of embeds waiting to be sent to the errors webhook.
+
+    Embeds are written to an SQLite database before anything is sent, so they survive a webhook outage or a restart.
+    A background task sends the due embeds in batches of up to 10 per message and retries failed batches with
+    exponential backoff. Embeds that Discord rejects permanently are moved to a dead letter table instead."""
+
+    def __init__(self, bot: discord.Bot, path: str, interval: float, max_backoff: float) -> None:
+        """Initialises a new outbox.
+
+        Parameters
+        ------------
+        bot: discord.Bot
+            The bot whose errors webhook the embeds are sent to.
+        path: str
+            The path of the SQLite database.
+        interval: float
+            The number of seconds between two attempts to drain the outbox, also the first retry delay.
+        max_backoff: float
+            The maximum number of seconds to wait before retrying a failed batch."""
+        self.bot: discord.Bot = bot
+        self.path: str = path
+        self.interval: float = interval
+        self.max_backoff: float = max_backoff
+        self.connection: sqlite3.Connection | None = None
+        self.pending: asyncio.Event = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Opens the database and creates the outbox and dead letter tables on first use.
+
+        Returns
+        -----------
+        sqlite3.Connection
+            The connection to the database."""
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.path)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, embed TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, next_attempt REAL NOT NULL DEFAULT 0)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS dead_letters (id INTEGER PRIMARY KEY, embed TEXT NOT NULL, "
+                "error TEXT NOT NULL, failed_at REAL NOT NULL)"
+            )
+            self.connection.commit()
+        return self.connection
+
+    def __len__(self) -> int:
+        return self.connect().execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def put(self, embed: discord.Embed) -> None:
+        """Writes an embed to the outbox and wakes up the sender.
+
+        Parameters
+        ------------
+        embed: discord.Embed
+            The embed to send."""
+        connection: sqlite3.Connection = self.connect()
+        connection.execute("INSERT INTO outbox (embed) VALUES (?)", (json.dumps(embed.to_dict()),))
+        connection.commit()
+        self.pending.set()
+
+    def start(self) -> None:
+        """Starts draining the outbox if it isn't running yet."""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self) -> None:
+        """Stops draining the outbox, the embeds that weren't sent yet stay in the outbox."""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self) -> None:
+        """Drains the outbox whenever an embed was added and periodically for retries."""
+        while True:
+            try:
+                await asyncio.wait_for(self.pending.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.pending.clear()
+            try:
+                await self.drain()
+            except Exception as e:
+                print("".join(traceback.format_exception(type(e), e, e.__traceback__)))
+
+    @staticmethod
+    def is_permanent(error: Exception) -> bool:
+        """Checks whether retrying a failed send can't succeed, which is the case for a 4xx other than 429.
+
+        Parameters
+        ------------
+        error: Exception
+            The error the send failed with.
+
+        Returns
+        -----------
+        bool
+            Whether the send failed permanently."""
+        return isinstance(error, discord.HTTPException) and 400 <= error.status < 500 and error.status != 429
+
+    def retry_later(self, batch: list[tuple[int, discord.Embed, int]], error: Exception) -> None:
+        """Schedules the next attempt of a failed batch with exponential backoff.
+
+        Parameters
+        ------------
+        batch: list[tuple[int, discord.Embed, int]]
+            The ids, embeds and previous attempts of the rows that failed.
+        error: Exception
+            The error the batch failed with."""
+        print(f"Failed to send {len(batch)} outbox embeds, retrying later: "
+              f"{''.join(traceback.format_exception_only(type(error), error)).strip()}")
+        connection: sqlite3.Connection = self.connect()
+        connection.executemany(
+            "UPDATE outbox SET attempts = ?, next_attempt = ? WHERE id = ?",
+            [(attempts + 1, time.time() + min(self.interval * 2 ** min(attempts, 16), self.max_backoff), row_id)
+             for row_id, _, attempts in batch]
+        )
+        connection.commit()
+
+    def dead_letter(self, row_id: int, error: Exception) -> None:
+        """Moves a row that Discord rejected permanently from the outbox to the dead letter table.
+
+        Parameters
+        ------------
+        row_id: int
+            The id of the row.
+        error: Exception
+            The error the row was rejected with."""
+        print(f"Discord rejected outbox embed {row_id}, moving it to the dead letters: "
+              f"{''.join(traceback.format_exception_only(type(error), error)).strip()}")
+        connection: sqlite3.Connection = self.connect()
+        connection.execute(
+            "INSERT OR REPLACE INTO dead_letters (id, embed, error, failed_at) "
+            "SELECT id, embed, ?, ? FROM outbox WHERE id = ?",
+            (str(error), time.time(), row_id)
+        )
+        connection.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+        connection.commit()
+
+    async def send(self, batch: list[tuple[int, discord.Embed, int]]) -> None:
+        """Sends a batch of embeds in one message and deletes them from the outbox.
+
+        Parameters
+        ------------
+        batch: list[tuple[int, discord.Embed, int]]
+            The ids, embeds and previous attempts of the rows to send."""
+        await self.bot.errors_webhook.send(
+            embeds=[embed for _, embed, _ in batch],
+            avatar_url=self.bot.user.display_avatar.url
+        )
+        connection: sqlite3.Connection = self.connect()
+        connection.executemany("DELETE FROM outbox WHERE id = ?", [(row_id,) for row_id, _, _ in batch])
+        connection.commit()
+
+    async def drain(self) -> None:
+        """Sends the due embeds in batches until none are due or a batch fails.
+
+        If Discord rejects a batch permanently, its embeds are sent one at a time so only the ones that are rejected
+        again are moved to the dead letter table."""
+        connection: sqlite3.Connection = self.connect()
+        while True:
+            rows: list[tuple[int, str, int]] = connection.execute(
+                "SELECT id, embed, attempts FROM outbox WHERE next_attempt <= ? ORDER BY id LIMIT 10", (time.time(),)
+            ).fetchall()
+            batch: list[tuple[int, discord.Embed, int]] = []
+            batch_length: int = 0
+            for row_id, embed_json, attempts in rows:
+                embed: discord.Embed = discord.Embed.from_dict(json.loads(embed_json))
+                if batch and batch_length + len(embed) > 6000:
+                    break
+                batch.append((row_id, embed, attempts))
+                batch_length += len(embed)
+            if not batch:
+                return
+            try:
+                await self.send(batch)
+                continue
+            except (discord.HTTPException, aiohttp.ClientError, OSError, asyncio.TimeoutError) as e:
+                if not self.is_permanent(e):
+                    self.retry_later(batch, e)
+                    return
+                if len(batch) == 1:
+                    self.dead_letter(batch[0][0], e)
+                    continue
+            for i, row in enumerate(batch):
+                try:
+                    await self.send([row])
+                except (discord.HTTPException, aiohttp.ClientError, OSError, asyncio.TimeoutError) as e:
+                    if not self.is_permanent(e):
+                        self.retry_later(batch[i:], e)
+                        return
+                    self.dead_letter(row[0], e)
@@ -0,0 +1,125 @@
+import json
+import os
+import types
+from typing import Any, NamedTuple
+
+__all__ = (
+    "guild_policies",
+    "GuildPolicies",
+    "GuildPolicyRegistry",
+)
+
+import core
+
+
+class GuildPolicies(NamedTuple):
+    """Represents a frozen snapshot of the per-guild policies."""
+    blocked_parent_ids: frozenset[int]
+    thread_dirs: types.MappingProxyType[int, tuple[int, int]]
+    ping_role_ids: types.MappingProxyType[int, int | None]
+
+
+class GuildPolicyRegistry:
+    """Represents the per-guild policies loaded from the guild policy file.
+
+    Every load builds a new frozen snapshot and swaps it in as a whole, so lookups never see a half-applied reload
+    and the file can be reloaded while the bot is running. Adding a guild only needs an entry in the file."""
+
+    def __init__(self, path: str) -> None:
+        """Initialises a new, empty guild policy registry.
+
+        Parameters
+        ------------
+        path: str
+            The path of the guild policy file."""
+        self.path: str = path
+        self.policies: GuildPolicies = GuildPolicies(frozenset(), types.MappingProxyType({}),
+                                                     types.MappingProxyType({}))
+        self.mtime: float | None = None
+
+    @property
+    def blocked_parent_ids(self) -> frozenset[int]:
+        """The ids of the channels whose threads members shouldn't be added to."""
+        return self.policies.blocked_parent_ids
+
+    @property
+    def thread_dirs(self) -> types.MappingProxyType[int, tuple[int, int]]:
+        """The channel and message ids of the thread directory of each guild."""
+        return self.policies.thread_dirs
+
+    @property
+    def ping_role_ids(self) -> types.MappingProxyType[int, int | None]:
+        """The id of the ping role of each guild."""
+        return self.policies.ping_role_ids
+
+    @staticmethod
+    def parse(data: Any) -> GuildPolicies:
+        """Parses and validates the content of a guild policy file.
+
+        Parameters
+        ------------
+        data: Any
+            The decoded content of the guild policy file.
+
+        Returns
+        -----------
+        GuildPolicies
+            The parsed guild policies.
+
+        Raises
+        -----------
+        ValueError
+            The content is malformed."""
+        try:
+            blocked_parent_ids: frozenset[int] = frozenset(int(channel_id) for channel_id in data["blocked_parent_ids"])
+            thread_dirs: dict[int, tuple[int, int]] = {}
+            ping_role_ids: dict[int, int | None] = {}
+            for guild_id, guild_policy in data["guilds"].items():
+                thread_dir: dict[str, int] | None = guild_policy.get("thread_directory")
+                if thread_dir is not None:
+                    thread_dirs[int(guild_id)] = (int(thread_dir["channel_id"]), int(thread_dir["message_id"]))
+                ping_role_id: int | None = guild_policy.get("ping_role_id")
+                ping_role_ids[int(guild_id)] = int(ping_role_id) if ping_role_id is not None else None
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Malformed guild policies: {e!r}") from e
+        return GuildPolicies(blocked_parent_ids, types.MappingProxyType(thread_dirs),
+                             types.MappingProxyType(ping_role_ids))
+
+    def load(self) -> GuildPolicies:
+        """Loads the guild policy file and swaps in its policies.
+
+        Returns
+        -----------
+        GuildPolicies
+            The loaded guild policies.
+
+        Raises
+        -----------
+        OSError
+            The guild policy file couldn't be read.
+        ValueError
+            The guild policy file is malformed, the previous policies stay in place."""
+        mtime: float = os.path.getmtime(self.path)
+        with open(self.path, encoding="utf-8") as file:
+            try:
+                data: Any = json.load(file)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Malformed guild policies: {e}") from e
+        self.policies = self.parse(data)
+        self.mtime = mtime
+        return self.policies
+
+    def reload(self) -> bool:
+        """Reloads the guild policy file if it changed since it was last loaded.
+
+        Returns
+        -----------
+        bool
+            Whether the guild policies were reloaded."""
+        if os.path.getmtime(self.path) == self.mtime:
+            return False
+        self.load()
+        return True
+
+
+guild_policies = GuildPolicyRegistry(core.config.guild_policy_path)
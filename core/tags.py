@@ -0,0 +1,396 @@
+import collections
+import json
+import os
+
+import discord
+
+__all__ = (
+    "autocomplete_tags",
+    "PrefixTrie",
+    "tag_store",
+    "TagStore",
+)
+
+import core
+
+_max_name_length: int = 100
+
+
+class PrefixTrie:
+    """Represents a prefix trie that maps every prefix of its keys to the names stored under them.
+
+    The names of a node are ranked the first time the node is searched and the ranking is kept until a name is
+    inserted or removed below it, so repeated searches don't sort the same names again."""
+
+    def __init__(self) -> None:
+        """Initialises a new, empty prefix trie."""
+        self.children: dict[str, PrefixTrie] = {}
+        self.names: set[str] = set()
+        self.ranked_names: list[str] | None = None
+
+    def insert(self, key: str, name: str) -> None:
+        """Stores a name under every prefix of a key.
+
+        Parameters
+        ------------
+        key: str
+            The key to store the name under.
+        name: str
+            The name to store."""
+        node: PrefixTrie = self
+        node.names.add(name)
+        node.ranked_names = None
+        for char in key:
+            node = node.children.setdefault(char, PrefixTrie())
+            node.names.add(name)
+            node.ranked_names = None
+
+    def remove(self, key: str, name: str) -> None:
+        """Removes a name from every prefix of a key, pruning nodes that end up empty.
+
+        Parameters
+        ------------
+        key: str
+            The key the name is stored under.
+        name: str
+            The name to remove."""
+        path: list[PrefixTrie] = [self]
+        for char in key:
+            if char not in path[-1].children:
+                break
+            path.append(path[-1].children[char])
+        for node in path:
+            node.names.discard(name)
+            node.ranked_names = None
+        for parent, char, node in reversed(list(zip(path, key, path[1:]))):
+            if not node.names:
+                del parent.children[char]
+
+    def search(self, prefix: str) -> list[str]:
+        """Gets the names stored under a prefix, shortest first.
+
+        Parameters
+        ------------
+        prefix: str
+            The prefix to search for.
+
+        Returns
+        -----------
+        list[str]
+            The names stored under a key starting with the prefix."""
+        node: PrefixTrie = self
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        if node.ranked_names is None:
+            node.ranked_names = sorted(node.names, key=lambda name: (len(name), name))
+        return node.ranked_names
+
+
+class TagStore:
+    """Represents the tags loaded from the tag file.
+
+    Tag names are indexed in a prefix trie of whole names, a prefix trie of the words after the first one and a
+    trigram index for fuzzy matching, so autocomplete doesn't need to scan every tag. Tags added or removed through
+    the store are written back to the tag file, so new tags don't need a deploy.
+
+    Every tag is also rendered into its embed once, when it is loaded or changed, so sending a tag is a lookup. The
+    rendered embeds are shared between invocations and must not be modified."""
+
+    def __init__(self, path: str) -> None:
+        """Initialises a new, empty tag store.
+
+        Parameters
+        ------------
+        path: str
+            The path of the tag file."""
+        self.path: str = path
+        self.tags: dict[str, str] = {}
+        self.name_trie: PrefixTrie = PrefixTrie()
+        self.word_trie: PrefixTrie = PrefixTrie()
+        self.trigrams: dict[str, set[str]] = {}
+        self.name_trigrams: dict[str, frozenset[str]] = {}
+        self.embeds: dict[str, discord.Embed] = {}
+        self.uses: collections.Counter[str] = collections.Counter()
+        self.mtime: float | None = None
+
+    @staticmethod
+    def get_keys(name: str) -> list[str]:
+        """Gets the keys a tag name is stored under, i.e. the normalised name starting at every word.
+
+        Parameters
+        ------------
+        name: str
+            The name of the tag.
+
+        Returns
+        -----------
+        list[str]
+            The keys of the tag name, the whole name first."""
+        words: list[str] = name.lower().split()
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    @staticmethod
+    def get_trigrams(text: str) -> set[str]:
+        """Gets the trigrams of a text, padded so the start and end of the text count too.
+
+        Parameters
+        ------------
+        text: str
+            The text to get the trigrams of.
+
+        Returns
+        -----------
+        set[str]
+            The trigrams of the text."""
+        padded: str = f"  {text.lower()} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def render(name: str, content: str) -> discord.Embed:
+        """Renders the embed of a tag, showing the first line that links a ``.png`` as the image.
+
+        Parameters
+        ------------
+        name: str
+            The name of the tag.
+        content: str
+            The content of the tag.
+
+        Returns
+        -----------
+        discord.Embed
+            The embed of the tag."""
+        image_url: str | None = next((line for line in content.splitlines() if line.endswith(".png")), None)
+        tag_embed = discord.Embed(
+            title=name,
+            description=content.replace(image_url, "") if image_url else content,
+            color=discord.Color.green()
+        )
+        if image_url:
+            tag_embed.set_image(url=image_url)
+        return tag_embed
+
+    def index(self, name: str) -> None:
+        """Adds a tag name to the indexes.
+
+        Parameters
+        ------------
+        name: str
+            The name of the tag."""
+        name_key, *word_keys = self.get_keys(name) or [""]
+        self.name_trie.insert(name_key, name)
+        for key in word_keys:
+            self.word_trie.insert(key, name)
+        trigrams: frozenset[str] = frozenset(self.get_trigrams(name))
+        for trigram in trigrams:
+            self.trigrams.setdefault(trigram, set()).add(name)
+        self.name_trigrams[name] = trigrams
+
+    def unindex(self, name: str) -> None:
+        """Removes a tag name from the indexes.
+
+        Parameters
+        ------------
+        name: str
+            The name of the tag."""
+        name_key, *word_keys = self.get_keys(name) or [""]
+        self.name_trie.remove(name_key, name)
+        for key in word_keys:
+            self.word_trie.remove(key, name)
+        for trigram in self.name_trigrams.pop(name, frozenset()):
+            names: set[str] = self.trigrams.get(trigram, set())
+            names.discard(name)
+            if not names:
+                self.trigrams.pop(trigram, None)
+
+    def load(self) -> None:
+        """Loads the tag file and rebuilds the indexes.
+
+        Raises
+        -----------
+        OSError
+            The tag file couldn't be read.
+        ValueError
+            The tag file is malformed or a tag name is too long to be an autocomplete choice, the previous tags stay
+            in place."""
+        mtime: float = os.path.getmtime(self.path)
+        with open(self.path, encoding="utf-8") as file:
+            tags: dict[str, str] = json.load(file)
+        if not isinstance(tags, dict) or not all(isinstance(name, str) and isinstance(content, str)
+                                                 for name, content in tags.items()):
+            raise ValueError("Malformed tags: expected an object mapping tag names to their content")
+        if any(len(name) > _max_name_length for name in tags):
+            raise ValueError(f"Malformed tags: tag names can't be longer than {_max_name_length} characters")
+        self.tags = tags
+        self.name_trie = PrefixTrie()
+        self.word_trie = PrefixTrie()
+        self.trigrams = {}
+        self.name_trigrams = {}
+        self.embeds = {}
+        for name, content in self.tags.items():
+            self.index(name)
+            self.embeds[name] = self.render(name, content)
+        self.mtime = mtime
+
+    def reload(self) -> bool:
+        """Reloads the tag file if it changed since it was last loaded or saved, e.g. because it was edited by hand.
+
+        Returns
+        -----------
+        bool
+            Whether the tags were reloaded."""
+        if os.path.getmtime(self.path) == self.mtime:
+            return False
+        self.load()
+        return True
+
+    def save(self) -> None:
+        """Writes the tags back to the tag file, replacing it atomically."""
+        temporary_path: str = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(dict(sorted(self.tags.items())), file, indent=2, ensure_ascii=False)
+            file.write("\n")
+        os.replace(temporary_path, self.path)
+        self.mtime = os.path.getmtime(self.path)
+
+    def get(self, name: str) -> str | None:
+        """Gets the content of a tag.
+
+        Parameters
+        ------------
+        name: str
+            The name of the tag.
+
+        Returns
+        -----------
+        str | None
+            The content of the tag, or None if the tag doesn't exist."""
+        return self.tags.get(name)
+
+    def get_embed(self, name: str) -> discord.Embed | None:
+        """Gets the rendered embed of a tag and counts the use of the tag.
+
+        Parameters
+        ------------
+        name: str
+            The name of the tag.
+
+        Returns
+        -----------
+        discord.Embed | None
+            The embed of the tag, or None if the tag doesn't exist."""
+        tag_embed: discord.Embed | None = self.embeds.get(name)
+        if tag_embed is not None:
+            self.uses[name] += 1
+        return tag_embed
+
+    def add(self, name: str, content: str) -> bool:
+        """Adds a tag or replaces its content and writes the tags back to the tag file.
+
+        Parameters
+        ------------
+        name: str
+            The name of the tag.
+        content: str
+            The content of the tag.
+
+        Returns
+        -----------
+        bool
+            Whether the tag is new.
+
+        Raises
+        -----------
+        ValueError
+            The tag name is longer than the 100 characters Discord allows for an autocomplete choice."""
+        if len(name) > _max_name_length:
+            raise ValueError(f"Tag names can't be longer than {_max_name_length} characters")
+        is_new: bool = name not in self.tags
+        self.tags[name] = content
+        if is_new:
+            self.index(name)
+        self.embeds[name] = self.render(name, content)
+        self.save()
+        return is_new
+
+    def remove(self, name: str) -> bool:
+        """Removes a tag and writes the tags back to the tag file.
+
+        Parameters
+        ------------
+        name: str
+            The name of the tag.
+
+        Returns
+        -----------
+        bool
+            Whether the tag existed."""
+        if name not in self.tags:
+            return False
+        del self.tags[name]
+        self.unindex(name)
+        del self.embeds[name]
+        self.uses.pop(name, None)
+        self.save()
+        return True
+
+    def autocomplete(self, query: str, limit: int = 25) -> list[str]:
+        """Gets the tag names matching a query, best matches first.
+
+        Names starting with the query come first, then names with a word starting with the query and then names
+        sharing enough trigrams with the query, e.g. for typos. Fuzzy candidates are gathered from the rarest
+        trigrams of the query first, up to ``config.tag_fuzzy_candidates`` names, so common trigrams shared by most
+        tags don't make every query score every tag.
+
+        Parameters
+        ------------
+        query: str
+            The text to match the tag names against.
+        limit: int
+            The maximum number of tag names to return.
+
+        Returns
+        -----------
+        list[str]
+            The matching tag names."""
+        query = " ".join(query.lower().split())
+        names: list[str] = self.name_trie.search(query)[:limit]
+        if len(names) < limit:
+            names.extend(name for name in self.word_trie.search(query)[:limit] if name not in names)
+        if len(names) >= limit or len(query) < 3:
+            return names[:limit]
+        query_trigrams: set[str] = self.get_trigrams(query)
+        candidates: set[str] = set()
+        for trigram_names in sorted((self.trigrams.get(trigram, set()) for trigram in query_trigrams), key=len):
+            if len(candidates) + len(trigram_names) > core.config.tag_fuzzy_candidates:
+                break
+            candidates |= trigram_names
+        candidates.difference_update(names)
+        scores: list[tuple[float, str]] = []
+        for name in candidates:
+            shared: int = len(query_trigrams & self.name_trigrams[name])
+            score: float = shared / (len(query_trigrams) + len(self.name_trigrams[name]) - shared)
+            if score >= core.config.tag_fuzzy_threshold:
+                scores.append((-score, name))
+        names.extend(name for _, name in sorted(scores)[:limit - len(names)])
+        return names
+
+
+async def autocomplete_tags(ctx: discord.AutocompleteContext) -> list[str]:
+    """Autocompletes the name of a tag.
+
+    Parameters
+    ------------
+    ctx: discord.AutocompleteContext
+        The context of the autocomplete request.
+
+    Returns
+    -----------
+    list[str]
+        The matching tag names."""
+    return tag_store.autocomplete(ctx.value or "")
+
+
+tag_store = TagStore(core.config.tag_path)
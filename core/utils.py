@@ -1,3 +1,8 @@
+import asyncio
+import os
+import re
+import time
+
 import discord
 
 __all__ = (
@@ -5,23 +10,45 @@ __all__ = (
     "add_mods",
     "add_to_feedback_thread_directory",
     "add_to_thread_directory",
+    "compile_feedback_patterns",
+    "delete_threads",
     "feedback_received",
+    "get_memory_usage",
     "get_permissions",
-    "get_tag",
     "get_valid_thread",
+    "invalidate_thread_dir_msg",
     "is_feedback",
     "is_valid_thread",
+    "pack_embeds",
+    "pack_fields",
+    "pack_lines",
+    "plan_mention_edits",
+    "refresh_thread_dir_msg",
     "remove_from_feedback_thread_directory",
     "remove_from_thread_directory",
+    "resolve_parent_ids",
 )
 
 import core
 
+_thread_dir_msgs: dict[int, list[discord.Message | discord.PartialMessage]] = {}
+
+_max_field_length: int = 1024
+_max_fields: int = 25
+_max_embed_length: int = 6000
+_max_embeds: int = 10
+
+_emoji_pattern: re.Pattern = re.compile(r"<a?:\w+:\d+>")
+_feedback_pattern: re.Pattern | None = None
+
 
 # functions
 async def add_to_feedback_thread_directory(thread: discord.Thread) -> bool:
     """Adds the feedback thread to the feedback thread directory.
 
+    Only threads waiting for feedback are added, the same rule the reconciliation of the directory applies, so it
+    doesn't remove them again.
+
     Parameters
     ------------
     thread: discord.Thread
@@ -30,18 +57,11 @@ async def add_to_feedback_thread_directory(thread: discord.Thread) -> bool:
     Returns
     -----------
     bool
-        Whether the feedback thread was added to the feedback thread directory successfully."""
-    thread_dir_msg: discord.Message | None = await get_thread_dir_msg(thread.guild)
-    if thread_dir_msg is None:
+        Whether the guild has a feedback thread directory and the feedback thread is waiting for feedback and was
+        queued for it."""
+    if thread.guild.id not in core.guild_policies.thread_dirs or not core.is_waiting_for_feedback(thread):
         return False
-    lines: list[str] = []
-    for field in thread_dir_msg.embeds[0].fields:
-        if str(thread.id) in field.value:
-            return True
-        lines.extend(field.value.splitlines())
-    lines.append(f"- <#{thread.id}> - Waiting since {discord.utils.format_dt(discord.utils.utcnow(), style='R')}")
-    thread_directory_embed: discord.Embed = await get_feedback_thread_directory_embed(lines, thread.guild)
-    await thread_dir_msg.edit(embed=thread_directory_embed, content=None)
+    core.submit_directory_operation(thread.guild, "add", thread.id, feedback=True)
     return True
 
 
@@ -52,13 +72,22 @@ async def add_members(thread: discord.Thread) -> None:
     ------------
     thread: discord.Thread
         The thread to add members to."""
+    started_at = time.perf_counter()
     await thread.join()
 
     ping_role = get_ping_role(thread.guild)
 
-    member_mentions = [member.mention for member in thread.guild.members if ping_role in member.roles]
-
-    if not member_mentions:
+    if ping_role is None:
+        return
+    if await core.role_index.wait_until_ready(thread.guild.id, core.config.role_index_ready_timeout):
+        member_ids: set[int] = core.role_index.get_holders(ping_role.id)
+    else:
+        print(f"The role index of {thread.guild.name} ({thread.guild.id}) isn't ready, adding the cached holders of "
+              f"the ping role to thread {thread.name} ({thread.id}) instead")
+        member_ids = {member.id for member in ping_role.members}
+    mention_edits: list[str] = plan_mention_edits(member_ids, ping_role)
+
+    if not mention_edits:
         return
     ping_msg: discord.Message = await thread.send(embed=discord.Embed(
         title="Adding Members",
@@ -66,17 +95,7 @@ async def add_members(thread: discord.Thread) -> None:
         color=discord.Color.blurple(),
         timestamp=discord.utils.utcnow()
     ))
-    msg_content = ""
-    counter = 0
-    for member_mention in member_mentions:
-        if len(msg_content + member_mention) > 2000 or counter == 10:
-            await ping_msg.edit(content=msg_content)
-            msg_content = f"{member_mention} "
-            counter = 1
-        else:
-            msg_content += f"{member_mention} "
-            counter += 1
-    if len(msg_content) != 0:
+    for msg_content in mention_edits:
         await ping_msg.edit(content=msg_content)
     embed_description = f"Successfully added users to the thread and set auto-archive duration to " \
                         f"{thread.auto_archive_duration // 1440} days!"
@@ -119,6 +138,8 @@ async def add_members(thread: discord.Thread) -> None:
         color=discord.Color.green(),
         timestamp=discord.utils.utcnow()
     ), content=message)
+    print(f"Added {len(member_ids)} members to thread {thread.name} ({thread.id}) with {len(mention_edits)} "
+          f"mention edits in {time.perf_counter() - started_at:.2f} s")
 
 
 async def add_mods(thread: discord.Thread) -> None:
@@ -161,21 +182,88 @@ async def add_to_thread_directory(thread: discord.Thread) -> bool:
     Returns
     -----------
     bool
-        Whether the thread was added to the thread directory successfully."""
-    thread_dir_msg: discord.Message | None = await get_thread_dir_msg(thread.guild)
-    if thread_dir_msg is None:
+        Whether the guild has a thread directory the thread was queued for."""
+    if thread.guild.id not in core.guild_policies.thread_dirs:
         return False
-    initial_embed: discord.Embed = thread_dir_msg.embeds[0]
-    thread_ids: list[int] = [int(line[4:-1]) for field in initial_embed.fields for line in field.value.splitlines()]
-    if thread.id in thread_ids:
-        return True
-    thread_ids.append(thread.id)
-    parent_ids: list[int] = await get_parent_ids(thread_ids, thread)
-    thread_directory_embed: discord.Embed = await get_thread_directory_embed(parent_ids, thread_ids, thread.guild)
-    await thread_dir_msg.edit(embed=thread_directory_embed, content=None)
+    core.submit_directory_operation(thread.guild, "add", thread.id)
     return True
 
 
+def compile_feedback_patterns() -> re.Pattern:
+    """Validates the feedback strings and compiles them into a single pattern that matches any of them.
+
+    The feedback strings are grouped by their first character and each group becomes one alternation behind the
+    group's common prefix, e.g. ``<:``. The groups are joined into one pattern, so a message is scanned once and
+    at every position the regex engine only tries the group starting with that character.
+
+    Returns
+    -----------
+    re.Pattern
+        The compiled feedback pattern.
+
+    Raises
+    -----------
+    ValueError
+        A feedback string is empty, duplicated or contains more than one emoji, which usually means a missing comma
+        merged two entries."""
+    global _feedback_pattern
+    problems: list[str] = []
+    groups: dict[str, list[str]] = {}
+    for feedback_string in core.config.feedback_strings:
+        if not isinstance(feedback_string, str) or not feedback_string.strip():
+            problems.append(f"{feedback_string!r} is empty")
+        elif feedback_string in groups.get(feedback_string[0], []):
+            problems.append(f"{feedback_string!r} is duplicated")
+        elif len(_emoji_pattern.findall(feedback_string)) > 1:
+            problems.append(f"{feedback_string!r} contains more than one emoji, is a comma missing?")
+        else:
+            groups.setdefault(feedback_string[0], []).append(feedback_string)
+    if problems:
+        raise ValueError("Malformed feedback strings:\n" + "\n".join(problems))
+    group_patterns: list[str] = []
+    for feedback_strings in groups.values():
+        prefix: str = os.path.commonprefix(feedback_strings)
+        group_patterns.append(
+            re.escape(prefix) + "(?:" + "|".join(re.escape(string[len(prefix):]) for string in feedback_strings) + ")"
+        )
+    _feedback_pattern = re.compile("|".join(group_patterns))
+    return _feedback_pattern
+
+
+async def delete_threads(threads: list[discord.Thread]) -> int:
+    """Deletes the threads specified concurrently.
+
+    At most ``config.thread_cleanup_concurrency`` threads are deleted at the same time and deletions that are still
+    rate limited after py-cord's own retries are retried up to ``config.thread_cleanup_retries`` times.
+
+    Parameters
+    ----------
+    threads: list[discord.Thread]
+        The threads to delete.
+
+    Returns
+    -------
+    int
+        The number of deleted threads."""
+    semaphore = asyncio.Semaphore(core.config.thread_cleanup_concurrency)
+
+    async def delete_thread(thread: discord.Thread) -> bool:
+        async with semaphore:
+            for retry in range(core.config.thread_cleanup_retries + 1):
+                try:
+                    await thread.delete()
+                    return True
+                except discord.NotFound:
+                    return False
+                except discord.HTTPException as e:
+                    if e.status != 429 or retry == core.config.thread_cleanup_retries:
+                        raise
+                    await asyncio.sleep(2 ** retry)
+        return False
+
+    return sum(await asyncio.gather(*(delete_thread(thread) for thread in threads)))
+
+
 async def feedback_received(message: discord.Message) -> None:
     """Marks feedback as received.
 
@@ -189,7 +277,7 @@ async def feedback_received(message: discord.Message) -> None:
                                     tag.id != core.config.bell_tag_id]
     await message.channel.edit(applied_tags=tags)
     await message.channel.send(
-        content=message.channel.owner.mention,
+        content=f"<@{message.channel.owner_id}>",
         embed=core.GreenEmbed(
             title="Feedback Received",
             description=f"""Feedback has been detected in this thread and the `🔔 Waiting for Feedback` tag has been removed.
@@ -198,103 +286,107 @@ async def feedback_received(message: discord.Message) -> None:
     )
 
 
-async def get_feedback_thread_directory_embed(lines: list[str], guild: discord.Guild) -> discord.Embed:
-    """Gets the feedback thread directory embed.
+def get_directory_embeds(title: str, description: str, fields: list[tuple[str, str]],
+                         guild: discord.Guild) -> list[discord.Embed]:
+    """Splits the fields of a directory into as many embeds as needed to stay within Discord's embed limits.
 
     Parameters
     ------------
-    lines: list[str]
-        The lines to add to the feedback thread directory embed.
+    title: str
+        The title of the directory.
+    description: str
+        The description of the directory.
+    fields: list[tuple[str, str]]
+        The names and values of the fields of the directory.
     guild: discord.Guild
-        The guild to get the thread directory embed for.
+        The guild to get the directory embeds for.
 
     Returns
     -----------
-    Embed
-        The feedback thread directory embed."""
-    thread_directory_embed = discord.Embed(
-        title="Feedback Thread Directory",
-        description="A list of all feedback threads of this server, sorted by the time they have been waiting for "
-                    "feedback. The threads at the top have been waiting the longest.",
-        color=guild.me.color,
-        timestamp=discord.utils.utcnow()
-    )
-    field_values: list[str] = []
-    field_value: str = ""
-    number_of_threads: int = len(lines)
-    for line in lines:
-        if len(field_value + line) > 1024:
-            field_values.append(f"{field_value}\n")
-            field_value = f"{line}\n"
-        else:
-            field_value += f"{line}\n"
-    if field_value != "":
-        field_values.append(field_value)
-    for i, field_value in enumerate(field_values):
-        thread_directory_embed.add_field(
-            name=f"Feedback Threads ({number_of_threads})" if i == 0 else "",
-            value=field_value,
-            inline=False
+    list[discord.Embed]
+        The directory embeds, one for each directory message."""
+    directory_embeds: list[discord.Embed] = []
+    for page in pack_fields(fields, len(title) + len(description)) or [[]]:
+        directory_embed = discord.Embed(
+            title=title if not directory_embeds else f"{title} (continued)",
+            description=description if not directory_embeds else None,
+            color=guild.me.color,
+            timestamp=discord.utils.utcnow()
         )
-    return thread_directory_embed
+        for name, value in page:
+            directory_embed.add_field(name=name, value=value, inline=False)
+        directory_embeds.append(directory_embed)
+    return directory_embeds
 
 
-async def get_thread_directory_embed(parent_ids: list[int], thread_ids: list[int],
-                                     guild: discord.Guild) -> discord.Embed:
-    """Gets the thread directory embed.
+async def get_feedback_thread_directory_embeds(lines: list[str], guild: discord.Guild) -> list[discord.Embed]:
+    """Gets the feedback thread directory embeds.
 
     Parameters
     ------------
-    parent_ids: list[int]
-        The parent ids for the thread ids specified.
-    thread_ids: list[int]
-        The thread ids to get the message parts for.
+    lines: list[str]
+        The lines to add to the feedback thread directory embeds.
     guild: discord.Guild
-        The guild to get the thread directory embed for.
+        The guild to get the thread directory embeds for.
 
     Returns
     -----------
-    Embed
-        The thread directory embed."""
-    thread_directory_embed = discord.Embed(
-        title="Thread Directory",
-        description="A list of all threads of this server, sorted by the parent channels of the threads.",
-        color=guild.me.color,
-        timestamp=discord.utils.utcnow()
+    list[discord.Embed]
+        The feedback thread directory embeds, one for each directory message."""
+    return get_directory_embeds(
+        "Feedback Thread Directory",
+        "A list of all feedback threads of this server, sorted by the time they have been waiting for feedback. "
+        "The threads at the top have been waiting the longest.",
+        [(f"Feedback Threads ({len(lines)})" if i == 0 else "", field_value)
+         for i, field_value in enumerate(pack_lines(lines))],
+        guild
     )
-    for parent_id in parent_ids:
-        field_value = "\n".join(
-            [f"- <#{thread_id}>" for thread_id in thread_ids
-             if (await guild.fetch_channel(thread_id)).parent.id == parent_id]
-        )
-        thread_directory_embed.add_field(
-            name=f"<#{parent_id}>",
-            value=field_value,
-            inline=False
-        )
-    return thread_directory_embed
 
 
-async def get_parent_ids(thread_ids: list[int], thread: discord.Thread) -> list[int]:
-    """Gets the parent ids of the thread ids specified.
+async def get_thread_directory_embeds(thread_parent_ids: dict[int, int], thread_ids: list[int],
+                                      guild: discord.Guild) -> list[discord.Embed]:
+    """Gets the thread directory embeds.
 
     Parameters
     ------------
+    thread_parent_ids: dict[int, int]
+        The resolved parent ids of the thread ids specified, keyed by thread id. Threads without a parent id are left
+        out.
     thread_ids: list[int]
-        The thread ids to get the parent ids of.
-    thread: discord.Thread
-        The thread to get the parent ids for.
+        The thread ids to get the message parts for.
+    guild: discord.Guild
+        The guild to get the thread directory embeds for.
 
     Returns
     -----------
-    list[int]
-        The parent ids of the thread ids specified."""
-    parent_ids = []
+    list[discord.Embed]
+        The thread directory embeds, one for each directory message."""
+    threads_by_parent: dict[int, list[str]] = {}
     for thread_id in thread_ids:
-        thread = await thread.guild.fetch_channel(thread_id)
-        if thread.parent_id not in parent_ids:
-            parent_ids.append(thread.parent.id)
-    return parent_ids
+        parent_id: int | None = thread_parent_ids.get(thread_id)
+        if parent_id is not None:
+            threads_by_parent.setdefault(parent_id, []).append(f"- <#{thread_id}>")
+    return get_directory_embeds(
+        "Thread Directory",
+        "A list of all threads of this server, sorted by the parent channels of the threads.",
+        [(f"<#{parent_id}>" if i == 0 else "", field_value) for parent_id, lines in threads_by_parent.items()
+         for i, field_value in enumerate(pack_lines(lines))],
+        guild
+    )
+
+
+def get_memory_usage() -> int | None:
+    """Gets the resident memory of the bot's process.
+
+    Returns
+    -----------
+    int | None
+        The resident memory in bytes, or None if it can't be read on this platform."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
 
 
 def get_permissions(user: discord.Member, include: int = 0) -> str:
@@ -336,97 +428,45 @@ def get_ping_role(guild: discord.Guild) -> discord.Role | None:
     ------------
     discord.Role
         The ping role for the guild specified."""
-    ping_role_ids = {
-        933075515881951292: 939633923305132182,  # RIP
-        959162264081014814: 939633923305132182,  # SEA
-        849650258786779196: None,  # EAR
-        915333299981934692: 941942976429559808  # TEST
-    }
-    ping_role_id = ping_role_ids.get(guild.id)
+    ping_role_id = core.guild_policies.ping_role_ids.get(guild.id)
     if ping_role_id is None:
         return None
     return guild.get_role(ping_role_id)
 
 
-def get_tag() -> dict[str, str]:
-    """Gets a tag for the bot.
+async def get_thread_dir_msgs(guild: discord.Guild) -> list[discord.Message | discord.PartialMessage] | None:
+    """Gets the thread directory messages for a guild.
 
-    Returns
-    ------------
-    dict[str, str]"""
-    tags: dict[str, str] = {
-        "Bastion Route Spreadsheet": "https://docs.google.com/spreadsheets/d/1qLgp5uhMOKuerNZaec1dpoECpJI0"
-                                     "-6YhztMqa_wZ8W0/edit?usp=sharing",
-        "Blaze Fight": "https://youtu.be/dUMclLehKXE",
-        "Bridge": "https://youtu.be/uvvhKX_KnT8",
-        "Cobble Skip": "https://youtu.be/HLrsRaij1x8",
-        "Dynamic RD": "https://youtu.be/qfwyFWTY3ds",
-        "Housing": "https://youtu.be/B2SLviws-3c",
-        "Kuee Housing": "https://www.twitch.tv/pncakespoon/clip/CovertShyTruffleHumbleLife-GbXo9QqoNykzFNLI",
-        "Language Guide": "https://docs.google.com/document/d/1jSeciLoEgSwWWCdNk0dKignzxJskxJ5_zeCQmcdGmTg/edit?usp"
-                          "=sharing",
-        "Lauf Crafting": "https://youtu.be/OHleXZuhYng",
-        "Lava Placement": "https://cdn.discordapp.com/attachments/751512715872436416/1005946160386687108"
-                          "/LavaPlacememt.png",
-        "Manhunt Housing": "https://youtu.be/A2tiwLB3DlY",
-        "Mapless": "https://youtu.be/ujZJw95h0nk",
-        "Ninjabrain Bot": "Bot: https://github.com/Ninjabrain1/Ninjabrain-Bot/releases/\r\n"
-                          "Tutorial: https://youtu.be/Rx8i7e5lu7g",
-        "Pig Punch": "When you break a chest/gold block, piglins who are on tier 1 **don't** upgrade to tier 2. "
-                     "However, when you punch a piglin, piglins **do** upgrade to tier 2, even if they're on tier 1. "
-                     "The significance of this is, that piglins on tier 1 lose interest in you as soon as they lose "
-                     "LOS, so you want them on tier 2 aggro. Use cases for this are: Manhunt, where you're aggroing "
-                     "piglins without armour, bridge manhunt, stables manhunt, treasure bridge, etc. Punching a pig "
-                     "is not beneficial in crookst boomer or when you are wearing gold armour.",
-        "Preemptive Navigation": "Video: https://youtu.be/2dWq2wXy43M\r\n"
-                                 "Document: https://docs.google.com/document/d/1NEJ_BaQOqyDlt"
-                                 "-h2GiUg4zXlqBHv8YfMVdGpQhDLD8U/edit?usp=sharing",
-        "Rawalle": "https://github.com/joe-ldp/Rawalle/releases/",
-        "Reset Tracker": "https://github.com/Specnr/ResetTracker",
-        "Right Shoulder Auto Funnel": "https://cdn.discordapp.com/attachments/751512715872436416/1006313251874820257"
-                                      "/rightShoulderAutoFunnel.png",
-        "Stables": "<:PauseMan:1005005749191184385>",
-        "Sub Pixel": "Left wide: -0.01\r\n"
-                     "Middle wide: +0.01\r\n"
-                     "Right wide: Do nothing\r\n"
-                     "https://cdn.discordapp.com/attachments/751512715872436416/1077348478654611486/image.png",
-        "Treasure": "https://youtu.be/HGcDSFKHOtw",
-        "Vietnamese": "Guide: https://docs.google.com/document/d/1el7XoX9-wv1boIQ8haIO6XYSoAkEQoh0X1Rd8_PcN70/edit\r\n"
-                      "Keyboard Doc: https://docs.google.com/document/d/1V2Uk4wDZknr6U9KbYJEc0JRYO7OWmhtmNIK0swTzXxs"
-                      "/edit\r\n "
-                      "Resource Pack: https://drive.google.com/file/d/1NXiqmJ40-Oi3LcLQgc8LNlgGhr0TrRG4/view",
-        "Wall": "Rawalle: https://github.com/joe-ldp/Rawalle/releases/\r\n"
-                "Specnr's wall: https://github.com/Specnr/MultiResetWall/releases/",
-        "Wood Light": "https://youtu.be/QFNvgd32TYY",
-        "Zero Cycle": "Video: https://youtu.be/YTVctKuUWbI\r\n"
-                      "Document: https://docs.google.com/document/d/1Umtj4jo69FnHz68cgp9TCrfDS-14Ummhi6ZDEXg4XGY/view"
-    }
-    return tags
-
-
-async def get_thread_dir_msg(guild: discord.Guild) -> discord.Message | None:
-    """Gets the thread directory message for a guild.
+    The first message is the configured thread directory message, the others are the continuation messages the bot
+    sent after it once the directory outgrew a single embed. The messages are only fetched the first time,
+    afterwards the cached message handles are returned.
 
     Parameters
     ----------
     guild: discord.Guild
-        The guild to get the thread directory message for.
+        The guild to get the thread directory messages for.
 
     Returns
     -------
-    discord.Message | None
-        The thread directory message for the guild, or None if it doesn't exist."""
-    thread_dirs = {
-        933075515881951292: [1152697393825976440, 1152718564944511037],  # RIP
-        959162264081014814: [959198464900747304, 1126961535605014609],  # SEA
-        849650258786779196: [1041033326846296164, 1126961177990287441],  # EAR
-        915333299981934692: [1160158020295217223, 1160158296834064384]  # TEST
-    }
-    channel_id, message_id = thread_dirs.get(guild.id)
+    list[discord.Message | discord.PartialMessage] | None
+        The thread directory messages for the guild, or None if the thread directory doesn't exist."""
+    channel_id, message_id = core.guild_policies.thread_dirs.get(guild.id, (None, None))
     if channel_id is None or message_id is None:
         return None
+    if guild.id in _thread_dir_msgs and _thread_dir_msgs[guild.id][0].id == message_id:
+        return _thread_dir_msgs[guild.id]
     channel = guild.get_channel(channel_id)
-    return await channel.fetch_message(message_id)
+    try:
+        thread_dir_msg: discord.Message = await channel.fetch_message(message_id)
+    except discord.NotFound:
+        return None
+    thread_dir_msgs: list[discord.Message | discord.PartialMessage] = [thread_dir_msg]
+    async for message in channel.history(after=thread_dir_msg, limit=None, oldest_first=True):
+        if message.author.id == guild.me.id and message.embeds and \
+                (message.embeds[0].title or "").endswith("Directory (continued)"):
+            thread_dir_msgs.append(message)
+    _thread_dir_msgs[guild.id] = thread_dir_msgs
+    return thread_dir_msgs
 
 
 async def get_valid_thread(*, ctx: discord.ApplicationContext, thread: discord.Thread) -> discord.Thread | None:
@@ -456,6 +496,19 @@ async def get_valid_thread(*, ctx: discord.ApplicationContext, thread: discord.T
     return thread
 
 
+def invalidate_thread_dir_msg(message_id: int) -> None:
+    """Invalidates the cached thread directory message handles after one of the messages was deleted.
+
+    Parameters
+    ----------
+    message_id: int
+        The id of the deleted message."""
+    for guild_id, thread_dir_msgs in _thread_dir_msgs.items():
+        if any(thread_dir_msg.id == message_id for thread_dir_msg in thread_dir_msgs):
+            del _thread_dir_msgs[guild_id]
+            return
+
+
 def is_feedback(message_content: str) -> bool:
     """Checks if a message is feedback.
 
@@ -463,7 +516,9 @@ def is_feedback(message_content: str) -> bool:
     ----------
     message_content: str
         The content of the message to check."""
-    return any(feedback_string in message_content for feedback_string in core.config.feedback_strings)
+    if _feedback_pattern is None:
+        compile_feedback_patterns()
+    return _feedback_pattern.search(message_content) is not None
 
 
 def is_valid_thread(thread: discord.Thread | discord.abc.GuildChannel) -> bool:
@@ -475,12 +530,157 @@ def is_valid_thread(thread: discord.Thread | discord.abc.GuildChannel) -> bool:
         The thread to check."""
     if not isinstance(thread, discord.Thread):
         return False
-    blocked_parent_ids = [959525754297778216, 1023877748818706452, 850422836585299989, 1057420004380921856]
-    if thread.parent_id in blocked_parent_ids:
+    if thread.parent_id in core.guild_policies.blocked_parent_ids:
         return False
     return True
 
 
+def plan_mention_edits(member_ids: set[int], role: discord.Role | None = None) -> list[str]:
+    """Plans the message contents that add members to a thread with as few message edits as possible.
+
+    Mentioning a member in a message edit adds them to the thread without pinging them. If the members are the holders
+    of a role with at most ``config.role_mention_member_limit`` members, a single role mention adds all of them.
+    Otherwise, the member mentions are packed greedily into edits of at most ``config.ping_mentions_per_edit``
+    mentions and 2000 characters, which is the minimal number of edits for those limits. The default of 50 mentions
+    stays within the largest mention limit AutoMod allows, e.g. 300 members take 6 edits instead of 30 with the
+    previous 10 mentions per edit. The edits are sent one after another, so py-cord's rate limit handling paces them
+    within the message edit bucket of the channel.
+
+    Parameters
+    ----------
+    member_ids: set[int]
+        The ids of the members to add to the thread.
+    role: discord.Role | None
+        The role the members hold.
+
+    Returns
+    -------
+    list[str]
+        The contents of the message edits."""
+    if not member_ids:
+        return []
+    if role is not None and len(member_ids) <= core.config.role_mention_member_limit:
+        return [role.mention]
+    member_mentions: list[str] = [f"<@{member_id}>" for member_id in member_ids]
+    mention_edits: list[str] = []
+    edit_start: int = 0
+    edit_length: int = -1
+    for i, member_mention in enumerate(member_mentions):
+        edit_length += len(member_mention) + 1
+        if i - edit_start == core.config.ping_mentions_per_edit or edit_length > 2000:
+            mention_edits.append(" ".join(member_mentions[edit_start:i]))
+            edit_start = i
+            edit_length = len(member_mention)
+    mention_edits.append(" ".join(member_mentions[edit_start:]))
+    return mention_edits
+
+
+def refresh_thread_dir_msg(payload: discord.RawMessageUpdateEvent) -> None:
+    """Refreshes the cached thread directory message handle from a gateway message edit.
+
+    Parameters
+    ----------
+    payload: discord.RawMessageUpdateEvent
+        The payload of the edited message."""
+    for thread_dir_msgs in _thread_dir_msgs.values():
+        for i, thread_dir_msg in enumerate(thread_dir_msgs):
+            if thread_dir_msg.id == payload.message_id:
+                thread_dir_msgs[i] = thread_dir_msg.channel.get_partial_message(payload.message_id)
+                return
+
+
+def pack_embeds(embeds: list[discord.Embed]) -> list[list[discord.Embed]]:
+    """Packs embeds into as few messages as possible without exceeding Discord's message limits.
+
+    A message holds at most 10 embeds and the embeds of a message can't exceed 6000 characters in total.
+
+    Parameters
+    ----------
+    embeds: list[discord.Embed]
+        The embeds to pack.
+
+    Returns
+    -------
+    list[list[discord.Embed]]
+        The embeds of every message."""
+    embed_lengths: list[int] = [len(embed) for embed in embeds]
+    pages: list[list[discord.Embed]] = []
+    page_start: int = 0
+    page_length: int = 0
+    for i, embed_length in enumerate(embed_lengths):
+        if i - page_start == _max_embeds or (i > page_start and page_length + embed_length > _max_embed_length):
+            pages.append(embeds[page_start:i])
+            page_start = i
+            page_length = 0
+        page_length += embed_length
+    if page_start < len(embeds):
+        pages.append(embeds[page_start:])
+    return pages
+
+
+def pack_fields(fields: list[tuple], reserved_length: int = 0) -> list[list[tuple]]:
+    """Packs embed fields into as few embeds as possible without exceeding Discord's embed limits.
+
+    Parameters
+    ----------
+    fields: list[tuple]
+        The fields to pack. The first two items of every field are its name and value.
+    reserved_length: int
+        The length of the embed that is already taken, e.g. by its title and description.
+
+    Returns
+    -------
+    list[list[tuple]]
+        The fields of every embed."""
+    field_lengths: list[int] = [len(field[0]) + len(field[1]) for field in fields]
+    pages: list[list[tuple]] = []
+    page_start: int = 0
+    page_length: int = reserved_length
+    for i, field_length in enumerate(field_lengths):
+        if i - page_start == _max_fields or (i > page_start and page_length + field_length > _max_embed_length):
+            pages.append(fields[page_start:i])
+            page_start = i
+            page_length = reserved_length
+        page_length += field_length
+    if page_start < len(fields):
+        pages.append(fields[page_start:])
+    return pages
+
+
+def pack_lines(lines: list[str], max_length: int = _max_field_length) -> list[str]:
+    """Packs lines into as few newline separated chunks as possible in a single pass.
+
+    Lines that are longer than the maximum length on their own are split.
+
+    Parameters
+    ----------
+    lines: list[str]
+        The lines to pack.
+    max_length: int
+        The maximum length of a chunk, e.g. the maximum length of an embed field value.
+
+    Returns
+    -------
+    list[str]
+        The chunks."""
+    line_lengths: list[int] = [len(line) for line in lines]
+    if any(line_length > max_length for line_length in line_lengths):
+        lines = [line[i:i + max_length] for line in lines for i in range(0, len(line) or 1, max_length)]
+        line_lengths = [len(line) for line in lines]
+    chunks: list[str] = []
+    chunk_start: int = 0
+    chunk_length: int = -1
+    for i, line_length in enumerate(line_lengths):
+        chunk_length += line_length + 1
+        if chunk_length > max_length:
+            chunks.append("\n".join(lines[chunk_start:i]))
+            chunk_start = i
+            chunk_length = line_length
+    if chunk_start < len(lines):
+        chunks.append("\n".join(lines[chunk_start:]))
+    return chunks
+
+
 async def remove_from_feedback_thread_directory(thread: discord.Thread) -> bool:
     """Removes a feedback thread from the feedback thread directory.
 
@@ -492,15 +692,10 @@ async def remove_from_feedback_thread_directory(thread: discord.Thread) -> bool:
     Returns
     -------
     bool
-        Whether the thread was removed successfully."""
-    thread_dir_msg: discord.Message | None = await get_thread_dir_msg(thread.guild)
-    if thread_dir_msg is None:
+        Whether the guild has a thread directory the removal was queued for."""
+    if thread.guild.id not in core.guild_policies.thread_dirs:
         return False
-    lines: list[str] = []
-    for field in thread_dir_msg.embeds[0].fields:
-        lines.extend([line for line in field.value.splitlines() if str(thread.id) not in line])
-    thread_directory_embed: discord.Embed = await get_feedback_thread_directory_embed(lines, thread.guild)
-    await thread_dir_msg.edit(embed=thread_directory_embed, content=None)
+    core.submit_directory_operation(thread.guild, "remove", thread.id, feedback=True)
     return True
 
 
@@ -515,16 +710,69 @@ async def remove_from_thread_directory(thread: discord.Thread) -> bool:
     Returns
     -------
     bool
-        Whether the thread was removed successfully."""
-    thread_dir_msg: discord.Message | None = await get_thread_dir_msg(thread.guild)
-    if thread_dir_msg is None:
+        Whether the guild has a thread directory the removal was queued for."""
+    if thread.guild.id not in core.guild_policies.thread_dirs:
         return False
-    initial_embed: discord.Embed = thread_dir_msg.embeds[0]
-    thread_ids: list[int] = [int(line[4:-1]) for field in initial_embed.fields for line in field.value.splitlines()]
-    if thread.id not in thread_ids:
-        return True
-    thread_ids.remove(thread.id)
-    parent_ids: list[int] = await get_parent_ids(thread_ids, thread)
-    thread_directory_embed: discord.Embed = await get_thread_directory_embed(parent_ids, thread_ids, thread.guild)
-    await thread_dir_msg.edit(embed=thread_directory_embed, content=None)
+    core.submit_directory_operation(thread.guild, "remove", thread.id)
     return True
+
+
+async def resolve_parent_ids(thread_ids: list[int], guild: discord.Guild) -> dict[int, int]:
+    """Resolves the parent ids of the thread ids specified.
+
+    Parent ids are looked up in the shared parent id cache and the gateway cache first. Threads missing from both are
+    resolved with a single active threads lookup and only threads that are still unresolved after that (e.g. archived
+    threads) are fetched, concurrently but limited by ``config.parent_id_fetch_concurrency``. Threads that no longer
+    exist are left out.
+
+    Parameters
+    ----------
+    thread_ids: list[int]
+        The thread ids to resolve the parent ids of.
+    guild: discord.Guild
+        The guild the threads belong to.
+
+    Returns
+    -------
+    dict[int, int]
+        The parent ids of the threads, keyed by thread id."""
+    parent_id_cache: core.ParentIdCache = core.parent_id_cache
+    parent_ids: dict[int, int] = {}
+    missing_ids: list[int] = []
+    for thread_id in thread_ids:
+        parent_id: int | None = parent_id_cache.get(thread_id)
+        if parent_id is not None:
+            parent_ids[thread_id] = parent_id
+            continue
+        thread: discord.Thread | discord.abc.GuildChannel | None = guild.get_channel_or_thread(thread_id)
+        if thread is None:
+            missing_ids.append(thread_id)
+            continue
+        parent_id_cache.stats["gateway"] += 1
+        parent_ids[thread_id] = parent_id_cache.set(thread_id, thread.parent_id)
+    if not missing_ids:
+        return parent_ids
+
+    active_thread_parent_ids: dict[int, int] = {thread.id: thread.parent_id for thread in await guild.active_threads()}
+    fetch_ids: list[int] = []
+    for thread_id in missing_ids:
+        if thread_id not in active_thread_parent_ids:
+            fetch_ids.append(thread_id)
+            continue
+        parent_id_cache.stats["active_threads"] += 1
+        parent_ids[thread_id] = parent_id_cache.set(thread_id, active_thread_parent_ids[thread_id])
+
+    semaphore = asyncio.Semaphore(core.config.parent_id_fetch_concurrency)
+
+    async def fetch_parent_id(fetch_id: int) -> None:
+        async with semaphore:
+            parent_id_cache.stats["rest"] += 1
+            try:
+                fetched_thread = await guild.fetch_channel(fetch_id)
+            except discord.NotFound:
+                parent_id_cache.mark_deleted(fetch_id)
+                return
+        parent_ids[fetch_id] = parent_id_cache.set(fetch_id, fetched_thread.parent_id)
+
+    await asyncio.gather(*(fetch_parent_id(thread_id) for thread_id in fetch_ids))
+    return parent_ids